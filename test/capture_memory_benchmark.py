@@ -0,0 +1,104 @@
+"""
+Peak RSS of the capture path for 8K and triple 4K screens. Every measurement runs in a fresh
+interpreter with the offscreen Qt platform and a fake grabber that returns a synthetic screenshot,
+so no desktop session is needed. A selection window captures, paints, emits a selection and closes
+several times in a row, and the script fails if the peak grows by more than `MAX_FRAMES` frames:
+one for the screenshot buffer and one for the window backing store, plus the crop and some slack.
+A growing peak over the captures means frames are kept alive after the window closes.
+
+Linux and macOS only, the peak is read with `resource`.
+
+Run from the repository root: python test/capture_memory_benchmark.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCREENS = {'8k': (7680, 4320), 'triple-4k': (3840 * 3, 2160)}
+CAPTURES = 5
+MAX_FRAMES = 2.5
+
+CAPTURE_SCRIPT = """
+import gc, sys, json, resource
+from PyQt5.QtCore import QRect, QPoint
+from PyQt5.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+from vis.ui.selection import SelectionWindow
+
+WIDTH, HEIGHT = {width}, {height}
+
+
+class Screenshot:
+    def __init__(self):
+        self.size = (WIDTH, HEIGHT)
+        self.raw = bytearray(WIDTH * HEIGHT * 4)
+
+
+class Grabber:
+    def screen_number_at(self, pos):
+        return 0
+
+    def screen_geometry(self, screen_number):
+        return QRect(0, 0, WIDTH, HEIGHT)
+
+    def grab(self, screen_number):
+        return Screenshot()
+
+
+def peak_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+window = SelectionWindow(Grabber(), reusable=True)
+window.enter_translation.connect(lambda origin, image: window.close())
+
+gc.collect()
+base = peak_mb()
+peaks = []
+
+for _ in range({captures}):
+    window.capture()
+    window.show()
+    app.processEvents()
+
+    window.selection_origin = QPoint(100, 100)
+    window.selection.setGeometry(QRect(100, 100, 1200, 400))
+    window.mouseReleaseEvent(None)
+    app.processEvents()
+
+    gc.collect()
+    peaks.append(peak_mb() - base)
+
+print(json.dumps({{"frame_mb": WIDTH * HEIGHT * 4 / 2 ** 20, "peaks_mb": peaks}}))
+"""
+
+
+def measure(width: int, height: int) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    script = CAPTURE_SCRIPT.format(width=width, height=height, captures=CAPTURES)
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+if __name__ == '__main__':
+    failed = False
+
+    for name, (width, height) in SCREENS.items():
+        result = measure(width, height)
+        frame_mb, peaks = result['frame_mb'], result['peaks_mb']
+
+        print(f"{name:>9}: frame {frame_mb:.0f} MB, peak after the first capture {peaks[0]:.0f} MB, "
+              f"after {len(peaks)} captures {peaks[-1]:.0f} MB")
+
+        if peaks[-1] > frame_mb * MAX_FRAMES:
+            print(f"{name:>9}: peak is over {MAX_FRAMES} frames ({frame_mb * MAX_FRAMES:.0f} MB)")
+            failed = True
+
+    sys.exit(1 if failed else 0)
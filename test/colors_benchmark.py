@@ -0,0 +1,67 @@
+"""
+Dominant color extraction across crop sizes: the previous PIL adaptive palette version
+against the NumPy bucketed histogram and its background/foreground fast mode.
+
+Run from the repository root: python test/colors_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from vis.utils.colors import get_dominant_colors, get_background_foreground
+
+SIZES = [(200, 50), (800, 200), (1920, 1080), (3840, 2160)]
+REPEATS = 20
+
+
+# Thanks to https://gist.github.com/zollinger/1722663
+def get_dominant_colors_palette(image: Image.Image, numcolors=10, resize=150):
+    image = image.copy()
+    image.thumbnail((resize, resize))
+
+    paletted = image.convert('P', palette=Image.ADAPTIVE, colors=numcolors)
+    palette = paletted.getpalette()
+    color_counts = sorted(paletted.getcolors(), reverse=True)
+
+    colors = []
+    for i in range(min(len(color_counts), numcolors)):
+        palette_index = color_counts[i][1]
+        colors.append(tuple(palette[palette_index * 3:palette_index * 3 + 3]))
+
+    while len(colors) < numcolors:
+        colors.append(colors[0])
+
+    return colors
+
+
+def render_image(size) -> Image.Image:
+    image = Image.new("RGB", size, (30, 34, 40))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype("resources/font.ttf", max(12, size[1] // 10))
+
+    for y in range(0, size[1], max(16, size[1] // 6)):
+        draw.text((10, y), "Dominant colors of a dark dialog", font=font, fill=(220, 220, 220))
+
+    return image
+
+
+def measure(method, image) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        method(image)
+
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == '__main__':
+    methods = [("palette", get_dominant_colors_palette), ("numpy", get_dominant_colors),
+               ("numpy fast", get_background_foreground)]
+
+    for size in SIZES:
+        image = render_image(size)
+        results = ', '.join(f"{name} {measure(method, image) * 1000:.2f} ms" for name, method in methods)
+        print(f"{size[0]}x{size[1]}: {results}")
@@ -0,0 +1,59 @@
+"""
+Deterministic fixture images for the benchmarks, rendered with the bundled font.
+"""
+from dataclasses import dataclass
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_PATH = "resources/font.ttf"
+
+THEMES = {
+    'light': ((250, 250, 250), (20, 20, 20)),
+    'dark': ((30, 32, 36), (225, 225, 225)),
+}
+
+TEXTS = {
+    ('Latin', 'line'): "The quick brown fox jumps over the lazy dog",
+    ('Latin', 'paragraph'): "Settings could not be saved because the file is in use.\n"
+                            "Close the other program and try again, or choose\n"
+                            "a different location for the configuration file.",
+    ('Cyrillic', 'line'): "Съешь же ещё этих мягких французских булок",
+    ('Cyrillic', 'paragraph'): "Не удалось сохранить настройки, потому что файл занят.\n"
+                               "Закройте другую программу и попробуйте снова или\n"
+                               "выберите другое место для файла конфигурации.",
+}
+
+FONT_SIZES = {'small': 14, 'medium': 22, 'large': 36}
+
+
+@dataclass
+class Fixture:
+    name: str
+    script: str
+    text: str
+    image: Image.Image
+
+
+def render_text_image(text: str, font_size: int, theme='light', margin=20) -> Image.Image:
+    background, foreground = THEMES[theme]
+    font = ImageFont.truetype(FONT_PATH, font_size)
+
+    left, top, right, bottom = ImageDraw.Draw(Image.new('RGB', (1, 1))).multiline_textbbox(
+        (0, 0), text, font=font, spacing=font_size // 2)
+
+    image = Image.new('RGB', (right - left + margin * 2, bottom - top + margin * 2), background)
+    ImageDraw.Draw(image).multiline_text((margin - left, margin - top), text, font=font, fill=foreground,
+                                         spacing=font_size // 2)
+    return image
+
+
+def build_fixtures() -> list:
+    """ Every combination of script, layout, font size and theme """
+    fixtures = []
+
+    for (script, layout), text in TEXTS.items():
+        for size_name, font_size in FONT_SIZES.items():
+            for theme in THEMES:
+                fixtures.append(Fixture(name=f"{script.lower()}-{layout}-{size_name}-{theme}", script=script,
+                                        text=text, image=render_text_image(text, font_size, theme)))
+
+    return fixtures
@@ -0,0 +1,46 @@
+"""
+Cost of a watch mode tick for a static region and for a changing one, and how many retrievals
+a subtitle-like sequence with fades triggers.
+
+Run from the repository root: python test/frame_diff_benchmark.py
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vis.utils.frames import FrameChangeDetector
+
+WIDTH, HEIGHT = 1200, 200
+TICKS = 200
+
+
+def frame(text_width: int, brightness=255) -> bytes:
+    pixels = np.full((HEIGHT, WIDTH, 4), 30, dtype=np.uint8)
+    pixels[80:120, 100:100 + text_width, :3] = brightness
+    return pixels.tobytes()
+
+
+def tick_ms(frames: list) -> float:
+    detector = FrameChangeDetector()
+
+    start = time.perf_counter()
+    for i in range(TICKS):
+        detector.update(frames[i % len(frames)], WIDTH, HEIGHT)
+
+    return (time.perf_counter() - start) * 1000 / TICKS
+
+
+if __name__ == '__main__':
+    print(f"static region: {tick_ms([frame(400)]):.2f} ms per tick")
+    print(f"changing region: {tick_ms([frame(400), frame(600)]):.2f} ms per tick")
+
+    # Two subtitles, each fading in over three grabs and then held
+    subtitles = [frame(400, level) for level in (80, 160)] + [frame(400)] * 4 + \
+                [frame(700, level) for level in (80, 160)] + [frame(700)] * 4
+
+    detector = FrameChangeDetector()
+    retrievals = sum(detector.update(subtitle, WIDTH, HEIGHT) for subtitle in subtitles)
+    print(f"subtitle sequence: {retrievals} retrievals for 2 subtitles")
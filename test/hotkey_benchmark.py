@@ -0,0 +1,70 @@
+"""
+Latency from the hotkey to the visible selection overlay with a new selection window per press (cold)
+and with the reused one (warm), plus the cost of the previous PNG round trip through temp files for
+comparison. Needs a real desktop session for mss.
+
+Run from the repository root: python test/hotkey_benchmark.py
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PIL import Image
+from mss import mss
+
+import vis
+
+REPEATS = 5
+
+
+def wait_exposed(window, timeout=5):
+    deadline = time.perf_counter() + timeout
+
+    while time.perf_counter() < deadline:
+        QApplication.processEvents()
+        if window.isVisible() and window.windowHandle() is not None and window.windowHandle().isExposed():
+            return
+
+
+def measure_overlay(controller) -> float:
+    start = time.perf_counter()
+
+    controller.enter_selection_window()
+    wait_exposed(controller.selection_window)
+
+    elapsed = time.perf_counter() - start
+    controller.close_all()
+    QApplication.processEvents()
+
+    return elapsed
+
+
+def measure_png_round_trip() -> float:
+    with mss() as sct:
+        screenshot = sct.grab(sct.monitors[1])
+
+    image = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    image.point(lambda p: p * 0.5).save(buffer, 'png')
+    Image.open(io.BytesIO(buffer.getvalue())).load()
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    for warm in (False, True):
+        controller = vis.WindowController(warm=warm)
+        controller.prewarm()
+
+        overlay = sorted(measure_overlay(controller) for _ in range(REPEATS))
+        print(f"hotkey -> overlay visible ({'warm' if warm else 'cold'}): "
+              f"{overlay[len(overlay) // 2] * 1000:.1f} ms (median)")
+
+    png = sorted(measure_png_round_trip() for _ in range(REPEATS))
+    print(f"previous PNG round trip: {png[len(png) // 2] * 1000:.1f} ms (median, not included above)")
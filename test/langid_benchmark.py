@@ -0,0 +1,131 @@
+"""
+Accuracy and latency of the built-in language identification compared to langdetect, on
+held-out UI-like sentences and on 1-3 word UI strings of every profile language. Wrong answers
+and undecided texts (None, the app falls back to langdetect then) are counted apart and listed:
+a wrong code is worse than none, it becomes the source language of the translation.
+
+Run from the repository root: python test/langid_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vis.ocr.langid import identify_language, PROFILE_LANGUAGES
+from vis.languages import to_short_code
+
+REPEATS = 20
+
+# Held out: written apart from the profiles and never used to tune them. Fix a miss by improving the
+# profiles with general frequency words, not with the words of these samples
+SAMPLES = {
+    'eng': ["Your changes will be lost if you leave this page", "Check for updates automatically every week",
+            "The download finished with two warnings"],
+    'deu': ["Ihre Änderungen gehen verloren, wenn Sie diese Seite verlassen",
+            "Automatisch jede Woche nach Updates suchen", "Der Download wurde mit zwei Warnungen beendet"],
+    'fra': ["Vos modifications seront perdues si vous quittez cette page",
+            "Rechercher automatiquement les mises à jour chaque semaine",
+            "Le téléchargement s'est terminé avec deux avertissements"],
+    'spa': ["Sus cambios se perderán si abandona esta página", "Buscar actualizaciones automáticamente cada semana",
+            "La descarga terminó con dos advertencias"],
+    'ita': ["Le modifiche andranno perse se lasci questa pagina",
+            "Cerca aggiornamenti automaticamente ogni settimana", "Il download è terminato con due avvisi"],
+    'por': ["Suas alterações serão perdidas se você sair desta página",
+            "Procurar atualizações automaticamente toda semana", "O download terminou com dois avisos"],
+    'nld': ["Je wijzigingen gaan verloren als je deze pagina verlaat", "Elke week automatisch naar updates zoeken",
+            "De download is voltooid met twee waarschuwingen"],
+    'pol': ["Twoje zmiany zostaną utracone, jeśli opuścisz tę stronę",
+            "Automatycznie sprawdzaj aktualizacje co tydzień", "Pobieranie zakończyło się z dwoma ostrzeżeniami"],
+    'ces': ["Vaše změny budou ztraceny, pokud opustíte tuto stránku",
+            "Automaticky kontrolovat aktualizace každý týden", "Stahování skončilo se dvěma varováními"],
+    'tur': ["Bu sayfadan ayrılırsanız değişiklikleriniz kaybolacak",
+            "Güncellemeleri her hafta otomatik olarak denetle", "İndirme iki uyarıyla tamamlandı"],
+    'rus': ["Ваши изменения будут потеряны, если вы покинете эту страницу",
+            "Автоматически проверять обновления каждую неделю", "Загрузка завершилась с двумя предупреждениями"],
+    'ukr': ["Ваші зміни буде втрачено, якщо ви залишите цю сторінку", "Автоматично перевіряти оновлення щотижня",
+            "Завантаження завершилося з двома попередженнями"],
+    'bel': ["Вашы змены будуць страчаны, калі вы пакінеце гэту старонку",
+            "Аўтаматычна правяраць абнаўленні кожны тыдзень", "Спампоўка скончылася з двума папярэджаннямі"],
+    'bul': ["Промените ви ще бъдат загубени, ако напуснете тази страница",
+            "Автоматично проверявай за актуализации всяка седмица", "Изтеглянето завърши с две предупреждения"],
+    'srp': ["Ваше измене ће бити изгубљене ако напустите ову страницу",
+            "Аутоматски проверавај ажурирања сваке недеље", "Преузимање је завршено са два упозорења"],
+    'mkd': ["Вашите промени ќе бидат изгубени ако ја напуштите оваа страница",
+            "Автоматски проверувај за ажурирања секоја недела", "Преземањето заврши со две предупредувања"],
+    'aze_cyrl': ["Бу сәһифәдән чыхсаныз дәјишикликләриниз итәҹәк", "Јениләмәләри һәр һәфтә автоматик јохла",
+                 "Јүкләмә ики хәбәрдарлыгла баша чатды"],
+    'uzb_cyrl': ["Агар бу саҳифадан чиқсангиз, ўзгаришлар йўқолади", "Янгиланишларни ҳар ҳафта автоматик текширинг",
+                 "Юклаб олиш иккита огоҳлантириш билан тугади"],
+}
+
+# Held out as well, the usual input of the app: buttons, menu items and titles
+SHORT_SAMPLES = {
+    'eng': ["Settings", "Error", "Cancel", "Open file", "Save as"],
+    'deu': ["Einstellungen", "Fehler", "Abbrechen", "Datei öffnen", "Speichern unter"],
+    'fra': ["Paramètres", "Erreur", "Annuler", "Ouvrir le fichier", "Enregistrer sous"],
+    'spa': ["Configuración", "Error", "Cancelar", "Abrir archivo", "Guardar como"],
+    'ita': ["Impostazioni", "Errore", "Annulla", "Apri file", "Salva con nome"],
+    'por': ["Configurações", "Erro", "Cancelar", "Abrir arquivo", "Salvar como"],
+    'nld': ["Instellingen", "Fout", "Annuleren", "Bestand openen", "Opslaan als"],
+    'pol': ["Ustawienia", "Błąd", "Anuluj", "Otwórz plik", "Zapisz jako"],
+    'ces': ["Nastavení", "Chyba", "Zrušit", "Otevřít soubor", "Uložit jako"],
+    'tur': ["Ayarlar", "Hata", "İptal", "Dosyayı aç", "Farklı kaydet"],
+    'rus': ["Настройки", "Ошибка", "Отмена", "Открыть файл", "Сохранить как"],
+    'ukr': ["Налаштування", "Помилка", "Скасувати", "Відкрити файл", "Зберегти як"],
+    'bel': ["Налады", "Памылка", "Скасаваць", "Адкрыць файл", "Захаваць як"],
+    'bul': ["Настройки", "Грешка", "Отказ", "Отвори файл", "Запази като"],
+    'srp': ["Подешавања", "Грешка", "Откажи", "Отвори датотеку", "Сачувај као"],
+    'mkd': ["Поставки", "Грешка", "Откажи", "Отвори датотека", "Зачувај како"],
+}
+
+
+def measure(detect, samples: dict) -> dict:
+    correct = wrong = total = 0
+    misses = {}
+    start = time.perf_counter()
+
+    for _ in range(REPEATS):
+        for lang, texts in samples.items():
+            for text in texts:
+                detected = detect(text)
+                if detected == to_short_code(lang):
+                    correct += 1
+                else:
+                    wrong += detected is not None
+                    misses[(lang, text)] = detected
+                total += 1
+
+    return {"accuracy": correct / total, "wrong": wrong / total, "undecided": (total - correct - wrong) / total,
+            "ms": (time.perf_counter() - start) * 1000 / total, "misses": misses}
+
+
+def detect_builtin(text: str):
+    lang = identify_language(text, PROFILE_LANGUAGES)
+    return to_short_code(lang) if lang else None
+
+
+def detect_langdetect(text: str):
+    import langdetect
+
+    langdetect.DetectorFactory.seed = 0
+    return langdetect.detect(text)
+
+
+if __name__ == '__main__':
+    detectors = [('built-in', detect_builtin)]
+
+    try:
+        import langdetect  # noqa: F401
+        detectors.append(('langdetect', detect_langdetect))
+    except ImportError:
+        print("langdetect is not installed, skipping it")
+
+    for samples_name, samples in (('sentences', SAMPLES), ('short', SHORT_SAMPLES)):
+        for name, detect in detectors:
+            result = measure(detect, samples)
+            print(f"{samples_name:>9} {name:>10}: {result['accuracy']:.0%} correct, {result['wrong']:.0%} wrong, "
+                  f"{result['undecided']:.0%} undecided, {result['ms']:.3f} ms per text")
+
+            for (lang, text), detected in result['misses'].items():
+                print(f"{'':>20}  {lang} as {detected}: {text}")
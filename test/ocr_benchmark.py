@@ -0,0 +1,175 @@
+"""
+OCR pipeline benchmark with regression gates. Every retrieve function runs over the rendered
+fixtures (Latin and Cyrillic, single lines and paragraphs, three font sizes, light and dark themes)
+and is measured for:
+
+- latency, the median of a few uncached runs per fixture, reported as p50 and p95 over fixtures
+- peak memory of the Python heap during a run (tracemalloc). Tesseract itself isn't included: it's
+  a subprocess with pytesseract and native memory with tesserocr, neither is seen by tracemalloc
+- character accuracy, 1 - edit distance / length of the expected text
+
+The results are compared to the baseline and the script exits with 1 if any function got slower,
+heavier or less accurate than the baseline allows, or if there is no baseline. Only the metrics in
+the baseline are gated. No baseline is committed, the numbers depend on the machine and the
+tesseract build: record it with --update-baseline on the machine that runs the gate.
+
+Run from the repository root: python test/ocr_benchmark.py [--update-baseline] [--output results.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from vis.ocr import (ocr_cache, SCRIPT_LANGUAGES, retrieve_text_document, retrieve_text_document_fast,
+                         retrieve_text_document_quality)
+except SystemExit:
+    # vis.ocr exits without an error code if tesseract is missing, the gate must not pass then
+    sys.exit(1)
+
+from fixtures import build_fixtures
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_benchmark_baseline.json")
+
+FUNCTIONS = {
+    'retrieve_text_document': retrieve_text_document,
+    'retrieve_text_document_fast': retrieve_text_document_fast,
+    'retrieve_text_document_quality': retrieve_text_document_quality,
+}
+
+REPEATS = 3
+
+# Allowed regression against the baseline
+LATENCY_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+ACCURACY_TOLERANCE = 0.02
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+
+    return previous[-1]
+
+
+def character_accuracy(expected: str, retrieved: str) -> float:
+    # Line breaks and repeated spaces don't count, only the characters
+    expected, retrieved = ' '.join(expected.split()), ' '.join(retrieved.split())
+    return max(0.0, 1 - edit_distance(expected, retrieved) / max(1, len(expected)))
+
+
+def measure_fixture(function, fixture) -> dict:
+    latencies = []
+    peak = 0
+
+    for _ in range(REPEATS):
+        ocr_cache.clear()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        document = function(fixture.image)
+        latencies.append(time.perf_counter() - start)
+
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {"latency": sorted(latencies)[len(latencies) // 2], "peak": peak,
+            "accuracy": character_accuracy(fixture.text, document.text)}
+
+
+def run_benchmark(functions: dict) -> dict:
+    # Fixtures of the scripts without installed languages can't be retrieved
+    fixtures = [fixture for fixture in build_fixtures() if fixture.script in SCRIPT_LANGUAGES]
+
+    # Loads the traineddata outside of the measurements
+    for function in functions.values():
+        function(fixtures[0].image)
+
+    results = {}
+    for name, function in functions.items():
+        measurements = {fixture.name: measure_fixture(function, fixture) for fixture in fixtures}
+        latencies = sorted(measurement['latency'] for measurement in measurements.values())
+
+        results[name] = {
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+            "heap_peak_mb": max(measurement['peak'] for measurement in measurements.values()) / 2 ** 20,
+            "accuracy": sum(measurement['accuracy'] for measurement in measurements.values()) / len(measurements),
+            "fixtures": {fixture: {"ms": measurement['latency'] * 1000, "accuracy": measurement['accuracy']}
+                         for fixture, measurement in measurements.items()},
+        }
+
+    return results
+
+
+def find_regressions(results: dict, baseline: dict) -> list:
+    regressions = []
+
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+
+        if 'p50_ms' in expected and result['p50_ms'] > expected['p50_ms'] * (1 + LATENCY_TOLERANCE):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.0f} ms, baseline {expected['p50_ms']:.0f} ms")
+
+        heap_limit = expected.get('heap_peak_mb', float('inf')) * (1 + MEMORY_TOLERANCE)
+        if result['heap_peak_mb'] > heap_limit:
+            regressions.append(f"{name}: heap peak {result['heap_peak_mb']:.1f} MB, "
+                               f"baseline {expected['heap_peak_mb']:.1f} MB")
+
+        if 'accuracy' in expected and result['accuracy'] < expected['accuracy'] - ACCURACY_TOLERANCE:
+            regressions.append(f"{name}: accuracy {result['accuracy']:.1%}, baseline {expected['accuracy']:.1%}")
+
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--update-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--output', help="also write the results to this file")
+    parser.add_argument('--function', action='append', choices=FUNCTIONS, help="measure only these functions")
+    args = parser.parse_args()
+
+    ocr_cache.path = None
+    results = run_benchmark({name: FUNCTIONS[name] for name in args.function or FUNCTIONS})
+
+    for name, result in results.items():
+        print(f"{name:>31}: p50 {result['p50_ms']:.0f} ms, p95 {result['p95_ms']:.0f} ms, "
+              f"heap peak {result['heap_peak_mb']:.1f} MB, accuracy {result['accuracy']:.1%}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    summary = {name: {key: value for key, value in result.items() if key != 'fixtures'}
+               for name, result in results.items()}
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+        print(f"Baseline is stored to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"There is no baseline at {args.baseline}, record it with --update-baseline")
+        sys.exit(1)
+
+    with open(args.baseline) as file:
+        regressions = find_regressions(summary, json.load(file))
+
+    for regression in regressions:
+        print(f"Regression: {regression}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,51 @@
+"""
+Per-capture latency of the tesseract backends. A capture is modelled as `retrieve_text_document`:
+one pass with all languages and one with the detected language.
+
+Run from the repository root: python test/ocr_engine_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from vis.ocr import ALL_LANGUAGE
+from vis.ocr.engine import PytesseractEngine, TesserocrEngine, tesserocr
+
+TEXT = "The quick brown fox jumps over the lazy dog.\nСъешь же ещё этих мягких французских булок."
+REPEATS = 10
+
+
+def render_image() -> Image.Image:
+    image = Image.new("RGB", (900, 120), (255, 255, 255))
+    font = ImageFont.truetype("resources/font.ttf", 24)
+    ImageDraw.Draw(image).multiline_text((10, 10), TEXT, font=font, fill=(0, 0, 0))
+    return image
+
+
+def measure(engine, image) -> float:
+    # First call initializes the engine, it is not part of the steady state
+    engine.image_to_string(image, ALL_LANGUAGE)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        engine.image_to_string(image, ALL_LANGUAGE)
+        engine.image_to_string(image, 'eng')
+
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == '__main__':
+    image = render_image()
+
+    engines = [PytesseractEngine()]
+    if tesserocr is not None:
+        engines.append(TesserocrEngine())
+    else:
+        print("tesserocr is not installed, only the fallback engine is measured")
+
+    for engine in engines:
+        print(f"{engine.name:>12}: {measure(engine, image) * 1000:.1f} ms per capture")
@@ -0,0 +1,45 @@
+"""
+Wall time of `retrieve_text_document_quality` with the serial osd and with the speculative one
+running next to the first pass, on every fixture.
+
+Run from the repository root: python test/quality_ocr_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vis.ocr
+
+from vis.ocr import ocr_cache, retrieve_text_document_quality
+from fixtures import build_fixtures
+
+
+def measure(fixtures: list, speculative: bool) -> dict:
+    vis.ocr.SPECULATIVE_OSD = speculative
+    latencies = []
+
+    for fixture in fixtures:
+        ocr_cache.clear()
+
+        start = time.perf_counter()
+        retrieve_text_document_quality(fixture.image)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {"p50_ms": latencies[len(latencies) // 2] * 1000, "total_ms": sum(latencies) * 1000}
+
+
+if __name__ == '__main__':
+    ocr_cache.path = None
+    fixtures = build_fixtures()
+
+    # Loads the traineddata of both modes
+    measure(fixtures[:1], False)
+    measure(fixtures[:1], True)
+
+    for speculative in (False, True):
+        result = measure(fixtures, speculative)
+        print(f"{'speculative' if speculative else 'serial':>11}: "
+              f"p50 {result['p50_ms']:.0f} ms, total {result['total_ms']:.0f} ms")
@@ -0,0 +1,88 @@
+"""
+Requests and latency of re-translating a long block after editing one of its lines, the whole
+text at once versus the changed segments only, against the local mock server. Also checks that
+concurrent translations of the same multi-line text send a single request, the script exits with 1
+otherwise.
+
+Run from the repository root: python test/segment_translation_benchmark.py
+"""
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vis.translator.backends import MockBackend
+from vis.translator.cache import TranslationCache
+from vis.translator.segments import translate_segments
+from vis.translator.mock_server import start_mock_server
+
+LINES = 40
+EDITS = 20
+LATENCY = 0.05
+CONCURRENT = 4
+
+
+def measure(backend, incremental: bool) -> dict:
+    cache = TranslationCache()
+    requests = 0
+
+    def counted_translate(text, source, target):
+        nonlocal requests
+        requests += 1
+        return backend.translate(text, source, target)
+
+    lines = [f"This is the line number {i} of the dialog." for i in range(LINES)]
+    translate_segments('\n'.join(lines), 'en', 'ru', counted_translate, cache)
+    requests = 0
+
+    start = time.perf_counter()
+    for edit in range(EDITS):
+        lines[edit % LINES] += " Edited."
+        text = '\n'.join(lines)
+
+        if incremental:
+            translate_segments(text, 'en', 'ru', counted_translate, cache)
+        else:
+            cache.get_or_translate(text, 'en', 'ru', counted_translate)
+
+    return {"requests": requests, "ms": (time.perf_counter() - start) * 1000 / EDITS}
+
+
+def measure_concurrent(backend) -> dict:
+    """ Provider requests and cache stats of `CONCURRENT` simultaneous translations of the same text """
+    cache = TranslationCache()
+    requests = 0
+
+    def counted_translate(text, source, target):
+        nonlocal requests
+        requests += 1
+        return backend.translate(text, source, target)
+
+    text = "Save changes?\nThe file was modified."
+    with ThreadPoolExecutor(CONCURRENT) as executor:
+        results = list(executor.map(lambda _: translate_segments(text, 'en', 'ru', counted_translate, cache),
+                                    range(CONCURRENT)))
+
+    return {"requests": requests, "identical": len(set(results)) == 1, **cache.stats}
+
+
+if __name__ == '__main__':
+    server = start_mock_server(latency=LATENCY)
+    backend = MockBackend(f"http://127.0.0.1:{server.server_port}")
+
+    for incremental in (False, True):
+        result = measure(backend, incremental)
+        print(f"{'segments' if incremental else 'whole text':>10}: {result['requests']} requests, "
+              f"{result['ms']:.1f} ms per edit")
+
+    concurrent = measure_concurrent(backend)
+    print(f"{CONCURRENT} concurrent: {concurrent['requests']} requests, {concurrent['misses']} misses, "
+          f"{concurrent['deduplicated']} deduplicated")
+
+    backend.close()
+    server.shutdown()
+
+    sys.exit(0 if concurrent['requests'] == 1 and concurrent['misses'] == 2 and concurrent['identical'] else 1)
@@ -0,0 +1,152 @@
+"""
+Headless cold start benchmark. Every measurement runs in a fresh interpreter with the offscreen
+Qt platform and stubbed hotkey and tray modules, and the results are emitted as JSON:
+
+- import time of the main modules, each imported alone
+- time until `vis_app.py` has the tray up and its event loop idle
+- time until the background warm up of the pipeline is done
+- latency of the first OCR and the first translation after that, against a fixture image
+  and the local mock translator
+
+The script fails if a stage wasn't reached, e.g. if `vis_app.py` didn't start the tray.
+
+Run from the repository root: python test/startup_benchmark.py [--output results.json]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ('vis.ui', 'vis.ocr', 'vis.translator', 'vis.languages')
+REPEATS = 3
+
+IMPORT_SCRIPT = """
+import json, time, importlib
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps({{"import_ms": (time.perf_counter() - start) * 1000}}))
+"""
+
+APP_SCRIPT = """
+import sys, json, time, types
+start = time.perf_counter()
+timings = {}
+
+# Stub the global hotkey and the tray icon, they need a desktop session
+keyboard = types.ModuleType('keyboard')
+keyboard.add_hotkey = lambda *args, **kwargs: None
+sys.modules['keyboard'] = keyboard
+
+class Icon:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def run_detached(self):
+        timings['tray_ms'] = (time.perf_counter() - start) * 1000
+
+    def stop(self):
+        pass
+
+pystray = types.ModuleType('pystray')
+pystray.Icon = Icon
+pystray.Menu = pystray.MenuItem = lambda *args, **kwargs: None
+sys.modules['pystray'] = pystray
+
+import vis
+
+def run():
+    # The event loop is left as soon as it gets idle
+    from PyQt5.QtCore import QTimer
+    app = vis.get_app()
+    QTimer.singleShot(0, app.quit)
+    app.exec()
+    timings['ready_ms'] = (time.perf_counter() - start) * 1000
+
+vis.run = run
+
+import runpy
+runpy.run_path('vis_app.py', run_name='__main__')
+
+# The warm up sets the cache paths, wait for it before turning them off
+from vis.utils.tasks import get_executor
+executor = get_executor()
+while executor.completed < executor.submitted:
+    time.sleep(0.005)
+timings['warm_ms'] = (time.perf_counter() - start) * 1000
+
+# Measure the pipeline itself, not the caches of the previous runs
+from vis.ocr import ocr_cache, retrieve_text_document
+from vis.translator import translation_cache, translate, set_backend
+from vis.translator.backends import MockBackend
+from vis.translator.mock_server import start_mock_server
+
+ocr_cache.path = None
+ocr_cache.clear()
+translation_cache.path = None
+translation_cache.clear()
+
+sys.path.insert(0, 'test')
+from fixtures import render_text_image, TEXTS
+
+image = render_text_image(TEXTS[('Latin', 'paragraph')], 22)
+server = start_mock_server(latency=0)
+set_backend(MockBackend(f"http://127.0.0.1:{server.server_port}"))
+
+ocr_start = time.perf_counter()
+document = retrieve_text_document(image)
+timings['first_ocr_ms'] = (time.perf_counter() - ocr_start) * 1000
+
+translate_start = time.perf_counter()
+translate(document.text, 'en', 'ru')
+timings['first_translate_ms'] = (time.perf_counter() - translate_start) * 1000
+
+print(json.dumps(timings))
+"""
+
+
+APP_STAGES = ('tray_ms', 'ready_ms', 'warm_ms', 'first_ocr_ms', 'first_translate_ms')
+
+
+def run_script(script: str) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def median(values: list) -> float:
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def run_benchmark() -> dict:
+    imports = {}
+    for module in MODULES:
+        imports[module] = median([run_script(IMPORT_SCRIPT.format(module=module))['import_ms']
+                                  for _ in range(REPEATS)])
+
+    app_runs = [run_script(APP_SCRIPT) for _ in range(REPEATS)]
+
+    missing = [stage for stage in APP_STAGES if any(stage not in run for run in app_runs)]
+    if missing:
+        raise RuntimeError(f"vis_app.py didn't reach {', '.join(missing)}")
+
+    app = {stage: median([run[stage] for run in app_runs]) for stage in APP_STAGES}
+
+    return {"python": sys.version.split()[0], "repeats": REPEATS, "import_ms": imports, **app}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = json.dumps(run_benchmark(), indent=2)
+    print(results)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(results)
@@ -0,0 +1,65 @@
+"""
+Time to the first text and total time of the streamed retrieval compared to the blocking one,
+on a tall image of stacked paragraph fixtures.
+
+Run from the repository root: python test/streaming_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from vis.ocr import ocr_cache, retrieve_text_document, stream_text_document
+from fixtures import render_text_image, TEXTS
+
+PARAGRAPHS = 12
+
+
+def tall_image() -> Image.Image:
+    paragraphs = [render_text_image(TEXTS[('Latin', 'paragraph')], 22) for _ in range(PARAGRAPHS)]
+
+    image = Image.new('RGB', (max(p.width for p in paragraphs), sum(p.height for p in paragraphs)), (250, 250, 250))
+    top = 0
+    for paragraph in paragraphs:
+        image.paste(paragraph, (0, top))
+        top += paragraph.height
+
+    return image
+
+
+def measure_stream(image: Image.Image) -> dict:
+    start = time.perf_counter()
+    first = None
+
+    stream = stream_text_document(image)
+    try:
+        while True:
+            next(stream)
+            if first is None:
+                first = time.perf_counter() - start
+    except StopIteration:
+        pass
+
+    total = time.perf_counter() - start
+    return {"first_ms": (first or total) * 1000, "total_ms": total * 1000}
+
+
+def measure_blocking(image: Image.Image) -> dict:
+    start = time.perf_counter()
+    retrieve_text_document(image)
+    total = time.perf_counter() - start
+
+    return {"first_ms": total * 1000, "total_ms": total * 1000}
+
+
+if __name__ == '__main__':
+    ocr_cache.path = None
+    image = tall_image()
+
+    for name, measure in (('blocking', measure_blocking), ('streamed', measure_stream)):
+        ocr_cache.clear()
+        result = measure(image)
+        print(f"{name:>8}: first text {result['first_ms']:.0f} ms, total {result['total_ms']:.0f} ms")
@@ -0,0 +1,57 @@
+"""
+OCR latency of large, sparse selections retrieved as is and packed to the detected text regions.
+
+Run from the repository root: python test/text_regions_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from vis.ocr import ALL_LANGUAGE
+from vis.ocr.engine import get_engine
+from vis.ocr.regions import crop_to_text
+
+SIZES = [(1280, 720), (1920, 1080), (3840, 2160)]
+REPEATS = 3
+
+
+def render_sparse_image(size) -> Image.Image:
+    """ A couple of text blocks in the corners and a picture in the middle """
+    image = Image.new("RGB", size, (245, 245, 245))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype("resources/font.ttf", 24)
+
+    draw.multiline_text((40, 40), "Settings\nSave changes before closing?", font=font, fill=(20, 20, 20))
+    draw.text((size[0] - 320, size[1] - 80), "Cancel    Save", font=font, fill=(20, 20, 20))
+    draw.ellipse((size[0] // 3, size[1] // 3, size[0] // 2, size[1] // 2), fill=(60, 120, 200))
+
+    return image
+
+
+def measure(method) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        method()
+
+    return (time.perf_counter() - start) / REPEATS
+
+
+if __name__ == '__main__':
+    engine = get_engine()
+
+    for size in SIZES:
+        image = render_sparse_image(size)
+        cropped, layout = crop_to_text(image)
+        share = cropped.width * cropped.height / (image.width * image.height)
+
+        full = measure(lambda: engine.image_to_string(image, ALL_LANGUAGE))
+        detection = measure(lambda: crop_to_text(image))
+        regions = measure(lambda: engine.image_to_string(cropped, ALL_LANGUAGE))
+
+        print(f"{size[0]}x{size[1]}: full {full * 1000:.0f} ms, "
+              f"detection {detection * 1000:.0f} ms + regions {regions * 1000:.0f} ms "
+              f"({len(layout)} regions packed to {cropped.width}x{cropped.height}, {share:.0%} of the pixels)")
@@ -0,0 +1,57 @@
+"""
+Scaling of the tiled OCR of a full page with the size of the process pool.
+
+Run from the repository root: python test/tiled_ocr_benchmark.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from vis.ocr import ALL_LANGUAGE, tiles
+
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt"
+
+
+def render_page(width=1600, height=2400) -> Image.Image:
+    image = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype("resources/font.ttf", 22)
+
+    y = 30
+    while y < height - 200:
+        for _ in range(5):
+            draw.text((30, y), PARAGRAPH, font=font, fill=(0, 0, 0))
+            y += 30
+        y += 30
+
+    return image
+
+
+def measure(image, workers) -> float:
+    tiles.set_workers(workers)
+
+    # Starts the pool and initializes the engine of every worker
+    tiles.image_to_string(image, ALL_LANGUAGE)
+
+    start = time.perf_counter()
+    tiles.image_to_string(image, ALL_LANGUAGE)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    page = render_page()
+    counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    counts = [count for count in counts if count <= (os.cpu_count() or 1)]
+
+    single = measure(page, 1)
+    print(f"1 core: {single * 1000:.0f} ms")
+
+    for count in counts[1:]:
+        elapsed = measure(page, count)
+        print(f"{count} cores: {elapsed * 1000:.0f} ms, speedup {single / elapsed:.2f}x")
+
+    tiles.set_workers(1)
@@ -0,0 +1,62 @@
+"""
+Throughput and latency of the http translator backend against the local mock server,
+with the pooled keep-alive session and with a new connection per request.
+
+Run from the repository root: python test/translator_benchmark.py
+"""
+import os
+import sys
+import time
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from vis.translator.backends import MockBackend
+from vis.translator.mock_server import start_mock_server, mock_translate
+
+REQUESTS = 200
+WORKERS = 8
+LATENCY = 0.01
+
+
+class UnpooledBackend(MockBackend):
+    name = 'unpooled'
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        params = {"sl": source, "tl": target, "q": text}
+        return requests.get(f"{self.url}/translate", params=params, timeout=self.timeout).json()['translation']
+
+
+def measure(backend) -> dict:
+    def timed_translate(i):
+        text = f"line number {i}"
+
+        start = time.perf_counter()
+        translation = backend.translate(text, 'en', 'ru')
+        assert translation == mock_translate(text, 'en', 'ru')
+
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as executor:
+        latencies = sorted(executor.map(timed_translate, range(REQUESTS)))
+    total = time.perf_counter() - start
+
+    return {"rps": REQUESTS / total,
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000}
+
+
+if __name__ == '__main__':
+    server = start_mock_server(latency=LATENCY)
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    for backend in (UnpooledBackend(url), MockBackend(url, pool_size=WORKERS)):
+        result = measure(backend)
+        print(f"{backend.name:>9}: {result['rps']:.0f} req/s, "
+              f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
+        backend.close()
+
+    server.shutdown()
@@ -1 +1,11 @@
-from vis.ui import *
\ No newline at end of file
+# The UI is imported on the first use, so `vis.ocr` and `vis.translator` can be used without Qt
+_UI_ATTRIBUTES = ('WindowController', 'WindowControllerThreadSafe', 'get_app', 'warm_up',
+                  'behave_as_daemon', 'run', 'quit')
+
+
+def __getattr__(name):
+    if name not in _UI_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from vis import ui
+    return getattr(ui, name)
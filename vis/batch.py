@@ -0,0 +1,227 @@
+"""
+Headless batch mode: retrieves and translates a folder of screenshots without Qt.
+
+    python -m vis.batch screenshots/ --to en --output results.jsonl
+    find captures -name '*.png' | python -m vis.batch - --to de
+
+Images are retrieved on a process pool and translated on a bounded thread pool, every result is
+written to the JSONL output as soon as it's ready. Paths already in the output are skipped, so an
+interrupted run continues where it stopped.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+__all__ = ('iter_image_paths', 'load_done_paths', 'run_batch')
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp'}
+
+# Images queued on the process pool per worker, bounds the memory of large manifests
+IMAGES_IN_FLIGHT_PER_WORKER = 2
+
+# Progress is reported every this many images
+REPORT_EVERY = 50
+
+
+def iter_image_paths(source: str):
+    """ Image paths of a directory (recursively, sorted) or of a manifest with a path per line, '-' is stdin """
+    if source == '-' or os.path.isfile(source):
+        manifest = sys.stdin if source == '-' else open(source, encoding='utf-8')
+
+        with manifest:
+            for line in manifest:
+                if line.strip():
+                    yield line.strip()
+        return
+
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+
+        for file in sorted(files):
+            if os.path.splitext(file)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(root, file)
+
+
+def load_done_paths(output: str) -> set:
+    """ Paths that already have a successful record in the output """
+    done = set()
+
+    try:
+        with open(output, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line of an interrupted run can be cut off
+                    continue
+
+                if 'error' not in record:
+                    done.add(record['path'])
+    except OSError:
+        pass
+
+    return done
+
+
+def _init_ocr_worker():
+    from vis.ocr import tiles
+
+    # Images are already retrieved in parallel, a single image isn't split to bands
+    tiles.set_workers(1)
+
+
+def _retrieve(path: str, mode: str, from_lang: str) -> dict:
+    """ Runs in a worker process """
+    from PIL import Image
+    from vis import ocr
+
+    start = time.perf_counter()
+
+    try:
+        with Image.open(path) as image:
+            image = image.convert('RGB')
+
+        if from_lang is not None:
+            record = {"text": ocr.retrieve_text_with_lang(image, ocr.to_ocr_language(from_lang)), "lang": from_lang}
+        else:
+            retrieve = {'quality': ocr.retrieve_text_document_quality,
+                        'normal': ocr.retrieve_text_document,
+                        'fast': ocr.retrieve_text_document_fast}[mode]
+
+            document = retrieve(image)
+            record = {"text": document.text, "lang": document.lang}
+    except Exception as exception:
+        return {"path": path, "error": f"ocr: {exception!r}"}
+
+    return {"path": path, **record, "ocr_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _translate(record: dict, to_lang: str) -> dict:
+    from vis.translator import translate
+
+    if record['lang'] == to_lang or not record['text'].strip():
+        return {**record, "translation": record['text']}
+
+    start = time.perf_counter()
+
+    try:
+        translation = translate(record['text'], record['lang'], to_lang)
+    except Exception as exception:
+        return {**record, "error": f"translate: {exception!r}"}
+
+    return {**record, "translation": translation, "translate_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def run_batch(paths, output: str, to_lang=None, from_lang=None, mode='normal', workers=None,
+              translate_workers=8, resume=True, report=None) -> dict:
+    """
+    Retrieves (and translates if `to_lang` is given) every image path and appends the records to the
+    `output` JSONL file. `report(stats)` is called every `REPORT_EVERY` images and at the end.
+    Returns the stats: processed images, errors, skipped ones, seconds and images per second.
+    """
+    workers = workers or os.cpu_count() or 1
+    done_paths = load_done_paths(output) if resume else set()
+
+    stats = {"images": 0, "errors": 0, "skipped": 0, "seconds": 0.0, "images_per_second": 0.0}
+    start = time.perf_counter()
+
+    def update_stats():
+        stats['seconds'] = round(time.perf_counter() - start, 2)
+        stats['images_per_second'] = round(stats['images'] / max(stats['seconds'], 1e-9), 2)
+
+    def pending_paths():
+        for path in paths:
+            if path in done_paths:
+                stats['skipped'] += 1
+            else:
+                yield path
+
+    remaining = pending_paths()
+    pending = {}
+    retrieving = 0
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+    with ProcessPoolExecutor(workers, initializer=_init_ocr_worker) as ocr_pool, \
+            ThreadPoolExecutor(translate_workers, thread_name_prefix='vis-batch') as translate_pool, \
+            open(output, 'a', encoding='utf-8') as out:
+
+        def fill():
+            nonlocal retrieving
+
+            while retrieving < workers * IMAGES_IN_FLIGHT_PER_WORKER:
+                path = next(remaining, None)
+                if path is None:
+                    return
+
+                pending[ocr_pool.submit(_retrieve, path, mode, from_lang)] = 'ocr'
+                retrieving += 1
+
+        def write(record: dict):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+
+            stats['images'] += 1
+            stats['errors'] += 'error' in record
+
+            if report is not None and stats['images'] % REPORT_EVERY == 0:
+                update_stats()
+                report(stats)
+
+        fill()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage = pending.pop(future)
+                record = future.result()
+
+                if stage == 'ocr':
+                    retrieving -= 1
+
+                    if to_lang is not None and 'error' not in record:
+                        pending[translate_pool.submit(_translate, record, to_lang)] = 'translate'
+                        continue
+
+                write(record)
+
+            fill()
+
+    update_stats()
+    if report is not None:
+        report(stats)
+
+    return stats
+
+
+def _print_report(stats: dict):
+    print(f"{stats['images']} images ({stats['errors']} errors, {stats['skipped']} skipped) "
+          f"in {stats['seconds']:.1f} s, {stats['images_per_second']:.2f} images/s", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vis.batch", description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('source', help="directory of images, manifest file with a path per line or - for stdin")
+    parser.add_argument('--output', '-o', default="results.jsonl", help="JSONL file the records are appended to")
+    parser.add_argument('--to', dest='to_lang', help="translate the text to this language, e.g. en")
+    parser.add_argument('--from', dest='from_lang', help="language of the text, detected if not given")
+    parser.add_argument('--mode', choices=('quality', 'normal', 'fast'), default='normal')
+    parser.add_argument('--workers', type=int, help="OCR processes, all cores by default")
+    parser.add_argument('--translate-workers', type=int, default=8, help="concurrent translation requests")
+    parser.add_argument('--no-resume', dest='resume', action='store_false',
+                        help="process the paths already in the output again")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(iter_image_paths(args.source), args.output, args.to_lang, args.from_lang, args.mode,
+                      args.workers, args.translate_workers, args.resume, _print_report)
+
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -187,4 +187,9 @@ LONG_LANGUAGE_CODES = {
 }
 
 # Table of lang codes from 639-2/T to 639-1
-SHORT_LANGUAGE_CODES = {v: k for k, v in LONG_LANGUAGE_CODES.items()}
\ No newline at end of file
+SHORT_LANGUAGE_CODES = {v: k for k, v in LONG_LANGUAGE_CODES.items()}
+
+
+def to_short_code(lang: str):
+    """ 639-1 code of a tesseract language, script variants like `aze_cyrl` included. None if unknown """
+    return SHORT_LANGUAGE_CODES.get(lang.split('_')[0])
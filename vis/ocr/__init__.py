@@ -1,18 +1,36 @@
-import re
-import pytesseract
-import langdetect
-
+from threading import Lock
 from dataclasses import dataclass
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor
 
 from .verify_tesseract import verify_tesseract_installed
 
 verify_tesseract_installed()
 
 from .languages import *
-from vis.languages import LONG_LANGUAGE_CODES
+from .engine import get_engine
+from .words import *
+from .cache import ocr_cache
+from .regions import crop_to_text
+from . import tiles
+from .langid import identify_language, text_script
+from vis.languages import LONG_LANGUAGE_CODES, to_short_code
+from vis.utils.timing import span, timed
+
+# Mean word confidence of the first pass that is good enough to skip the language pass
+HIGH_CONFIDENCE = 85
+
+# Lines below this mean word confidence are retrieved again with the detected language
+LOW_LINE_CONFIDENCE = 60
+LINE_PADDING = 4
+MAX_LOW_LINES_RATIO = 0.5
+
+# The quality retrieval runs osd at the same time as the first pass instead of before it
+SPECULATIVE_OSD = True
 
 __all__ = ('TextDocument', 'retrieve_text_document_quality', 'retrieve_text_document',
-           'retrieve_text_document_fast', 'retrieve_text_with_lang',
+           'retrieve_text_document_fast', 'retrieve_text_with_lang', 'stream_text_document', 'detect_language',
+           'ocr_cache', 'warm_up',
            *languages.__all__)
 
 
@@ -23,69 +41,250 @@ class TextDocument:
     lang: str
 
 
+_osd_executor: ThreadPoolExecutor = None
+_osd_executor_lock = Lock()
+
+
+def _get_osd_executor() -> ThreadPoolExecutor:
+    global _osd_executor
+
+    with _osd_executor_lock:
+        if _osd_executor is None:
+            _osd_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='osd')
+
+    return _osd_executor
+
+
+def detect_language(text: str, candidates=None) -> tuple:
+    """
+    Returns 639-1 and tesseract codes of the text language. Only the candidates (installed tesseract
+    languages by default) are considered, langdetect is the fallback for the ones without a built-in profile.
+    """
+    with span('ocr.detect_language'):
+        long_lang = identify_language(text, SUPPORTED_OCR_LANGUAGES if candidates is None else candidates)
+
+    if long_lang is not None:
+        return to_short_code(long_lang) or 'en', long_lang
+
+    import langdetect
+
+    # Deterministic results
+    langdetect.DetectorFactory.seed = 0
+
+    try:
+        short_lang = langdetect.detect(text)
+    except langdetect.LangDetectException:
+        return 'en', None
+
+    return short_lang, LONG_LANGUAGE_CODES.get(short_lang, None)
+
+
+@ocr_cache.cached
 def retrieve_text_document_quality(image, context_image=None) -> TextDocument:
     """
     This method automatically detects the script and from it the languages. This helps to more clearly
     identify the language in the image. After that it works the same way as `retrieve_text_document()`.
 
     Should only be used for large images or with a context image as osd source.
+
+    With `SPECULATIVE_OSD` the osd runs at the same time as the all languages first pass. Its script
+    is used if it's ready first, or if the first pass text has no script with installed languages;
+    otherwise the script of the text is used and the osd is cancelled, unless it has started already.
     """
 
     if context_image is None:
         context_image = image
 
+    if not SPECULATIVE_OSD:
+        return _retrieve_text_document_serial(image, context_image)
+
     # Try to get osd from a context image
+    osd = _get_osd_executor().submit(copy_context().run, _detect_script, context_image)
+
+    image, _ = _crop_to_text(image)
+
+    with span('ocr.first_pass'):
+        words = tiles.image_to_words(image, ALL_LANGUAGE)
+
+    script = text_script(words_to_text(words))
+
+    if osd.done() or script not in SCRIPT_LANGUAGES:
+        # Ready anyway or the only clue left
+        osd_script = _osd_result(osd)
+        if osd_script in SCRIPT_LANGUAGES:
+            script = osd_script
+    else:
+        # Only a queued osd can be cancelled, a running one finishes and is ignored
+        osd.cancel()
+
+    return _refine_document(image, words, ALL_LANGUAGE, SCRIPT_LANGUAGES.get(script))
+
+
+def _osd_result(osd):
+    """ Script of a finished or running osd, None if it failed """
     try:
-        # Can raise TesseractError with too few characters
-        # TODO: Save context_image manually with resolution meta
-        osd = pytesseract.image_to_osd(context_image)
-    except pytesseract.TesseractError:
+        return osd.result()
+    except Exception:
+        return None
+
+
+def _detect_script(image):
+    with span('ocr.osd'):
+        return get_engine().detect_script(image)
+
+
+def _crop_to_text(image):
+    with span('ocr.crop_to_text'):
+        return crop_to_text(image)
+
+
+def _retrieve_text_document_serial(image, context_image) -> TextDocument:
+    script = _detect_script(context_image)
+
+    if script is None:
         # Fallback
         return retrieve_text_document(image)
 
-    script = re.search("Script: ([a-zA-Z]+)\n", osd).group(1)
-
     # We need all the script languages so that tesseract knows which alphabets to use to define the text
-    script_languages = '+'.join(SCRIPT_LANGUAGES.get(script, 'eng'))
+    script_languages = '+'.join(SCRIPT_LANGUAGES.get(script, ['eng']))
 
     return retrieve_text_document(image, script_languages)
 
 
+@ocr_cache.cached
 def retrieve_text_document(image, default_lang=ALL_LANGUAGE) -> TextDocument:
     """
-    Retrieves text with all possible languages, detects the exact language and retrieves the
-    text again, but with the correct language.
+    Retrieves text with all possible languages and detects the exact language. If the first pass
+    wasn't done with the detected language and some of its lines have low confidence, only these
+    lines are retrieved again, but with the correct language.
 
     Should only be used for medium or large images
     """
 
-    text = pytesseract.image_to_string(image, lang=default_lang)
+    # Word boxes are relative to the crop from here on
+    image, _ = _crop_to_text(image)
+
+    with span('ocr.first_pass'):
+        words = tiles.image_to_words(image, default_lang)
+
+    return _refine_document(image, words, default_lang)
+
+
+def stream_text_document(image, default_lang=ALL_LANGUAGE):
+    """
+    Generator version of `retrieve_text_document()`. Yields the first pass text band by band as soon
+    as it's retrieved, every band with its leading line breaks, and returns the final document, whose
+    low confidence lines may be retrieved again with the detected language. Shares the cache with
+    `retrieve_text_document()`.
+    """
+    key = ocr_cache.key_for(retrieve_text_document, image, default_lang)
+
+    document = ocr_cache.get(key)
+    if document is not None:
+        return document
+
+    image, _ = _crop_to_text(image)
+
+    words = []
+    bands = tiles.iter_band_words(image, default_lang)
+
+    try:
+        while True:
+            # Only the retrieval is timed, not the consumer of the yielded text
+            with span('ocr.first_pass'):
+                band_words = next(bands, None)
+
+            if band_words is None:
+                break
+
+            text = words_to_text(band_words)
+            if text:
+                # Bands never share a block, the same as in `words_to_text()`
+                yield ('\n\n' if words else '') + text
+
+            words.extend(band_words)
+    finally:
+        # Cancels the pending bands if the consumer stops early
+        bands.close()
+
+    document = _refine_document(image, words, default_lang)
+    ocr_cache.put(key, document)
+
+    return document
+
+
+def _refine_document(image, words: list, default_lang: str, candidates=None) -> TextDocument:
+    """ Detects the language of the first pass words and retrieves their low confidence lines again """
+    text = words_to_text(words)
 
     if len(text) == 0:
         return TextDocument(text="There is no text in the image!", lang='en')
 
-    short_lang = langdetect.detect(text)
-    long_lang = LONG_LANGUAGE_CODES.get(short_lang, None)
+    short_lang, long_lang = detect_language(text, candidates)
+
+    if long_lang not in SUPPORTED_OCR_LANGUAGES or long_lang == default_lang:
+        return TextDocument(text=text, lang=short_lang)
+
+    if mean_confidence(words) >= HIGH_CONFIDENCE:
+        return TextDocument(text=text, lang=short_lang)
+
+    return TextDocument(text=_retrieve_low_confidence_lines(image, words, long_lang), lang=short_lang)
+
+
+@timed('ocr.second_pass')
+def _retrieve_low_confidence_lines(image, words: list, lang: str) -> str:
+    """ Retrieves again low confidence lines with the given language and returns the updated text """
+    lines = group_lines(words)
+    low_lines = [line for line in lines if mean_confidence(line) < LOW_LINE_CONFIDENCE]
 
-    if long_lang not in SUPPORTED_OCR_LANGUAGES:
-        long_lang = default_lang
+    if len(low_lines) == 0:
+        return words_to_text(words)
 
-    # Retrieve again with correct language
-    text = pytesseract.image_to_string(image, lang=long_lang)
+    # Many small tesseract runs cost more than a single one over the whole image
+    if len(low_lines) > len(lines) * MAX_LOW_LINES_RATIO:
+        return tiles.image_to_string(image, lang)
 
-    return TextDocument(text=text, lang=short_lang)
+    for line in low_lines:
+        left, top, right, bottom = line_bounding_box(line, padding=LINE_PADDING)
+        box = (left, top, min(right, image.width), min(bottom, image.height))
+        line_text = ' '.join(get_engine().image_to_string(image.crop(box), lang).split())
 
+        if line_text:
+            # Keep the line in place by replacing its words with a single one
+            line[0].text = line_text
+            del line[1:]
 
+    return words_to_text([word for line in lines for word in line])
+
+
+@ocr_cache.cached
 def retrieve_text_document_fast(image, default_lang=ALL_LANGUAGE) -> TextDocument:
     """ Retrieves text with all possible languages. """
-    text = pytesseract.image_to_string(image, lang=default_lang)
+    image, _ = _crop_to_text(image)
+
+    with span('ocr.first_pass'):
+        text = tiles.image_to_string(image, default_lang)
 
     if len(text) == 0:
         return TextDocument(text="There is no text in the image!", lang='en')
 
-    lang = langdetect.detect(text)
+    lang, _ = detect_language(text)
     return TextDocument(text=text, lang=lang)
 
 
+@ocr_cache.cached
 def retrieve_text_with_lang(image, lang) -> str:
-    return pytesseract.image_to_string(image, lang=lang)
+    image, _ = _crop_to_text(image)
+
+    with span('ocr.first_pass'):
+        return tiles.image_to_string(image, lang)
+
+
+def warm_up():
+    """ Loads tesseract and the language profiles ahead of the first capture, meant to run in the background """
+    from PIL import Image
+
+    get_engine().image_to_string(Image.new('RGB', (32, 32), (255, 255, 255)), ALL_LANGUAGE)
+
+    for script_sample in ("warm up", "прогрев"):
+        identify_language(script_sample, SUPPORTED_OCR_LANGUAGES)
@@ -0,0 +1,227 @@
+import os
+import pickle
+import inspect
+import hashlib
+
+from typing import NamedTuple
+from threading import Lock
+from functools import wraps
+from collections import OrderedDict
+from PIL import Image
+
+__all__ = ('OcrCache', 'ImageKey', 'ocr_cache')
+
+
+class ImageKey(NamedTuple):
+    width: int
+    height: int
+    kind: str
+    digest: object
+
+
+class OcrCache:
+    """
+    Cache of retrieved text keyed by the image pixels and the call arguments.
+
+    The memory tier is a bounded LRU. If `path` is given, entries are also pickled to that directory,
+    so they survive restarts. The directory keeps at most `max_disk_size` entries, the least recently
+    used by modification time are removed first. In perceptual mode images are keyed by a difference hash instead of the
+    exact pixels, and an image within `max_distance` bits of a cached one of nearly the same size is
+    a hit, which tolerates a selection moved or resized by a couple of pixels.
+    """
+
+    def __init__(self, max_size=128, path=None, perceptual=False, max_distance=4, max_size_delta=4,
+                 max_disk_size=2048):
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self.path = path
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        self.max_size_delta = max_size_delta
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "size": len(self._entries)}
+
+    def image_key(self, image: Image.Image) -> ImageKey:
+        if self.perceptual:
+            return ImageKey(image.width, image.height, 'dhash', _difference_hash(image))
+
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        return ImageKey(image.width, image.height, image.mode, digest.hexdigest())
+
+    def get(self, key: tuple):
+        """ Returns cached value or None """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            if self.perceptual:
+                similar_key = self._find_similar(key)
+                if similar_key is not None:
+                    self._entries.move_to_end(similar_key)
+                    self.hits += 1
+                    return self._entries[similar_key]
+
+        value = self._load(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._put_memory(key, value)
+            return value
+
+    def put(self, key: tuple, value):
+        with self._lock:
+            self._put_memory(key, value)
+
+        self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def key_for(self, method, *args, **kwargs) -> tuple:
+        """
+        Key of a call of the retrieve function, images in the arguments are keyed by their pixels.
+        Default arguments are included, so a call with and without them has the same key.
+        """
+        method = getattr(method, '__wrapped__', method)
+
+        bound = inspect.signature(method).bind(*args, **kwargs)
+        bound.apply_defaults()
+
+        return (method.__name__,
+                *(self.image_key(arg) if isinstance(arg, Image.Image) else arg for arg in bound.arguments.values()))
+
+    def cached(self, method):
+        """ Decorator for the retrieve functions """
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            key = self.key_for(method, *args, **kwargs)
+
+            value = self.get(key)
+            if value is None:
+                value = method(*args, **kwargs)
+                self.put(key, value)
+
+            return value
+
+        return wrapper
+
+    def _put_memory(self, key: tuple, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _find_similar(self, key: tuple):
+        for cached_key in reversed(self._entries):
+            if len(cached_key) != len(key) or cached_key[0] != key[0]:
+                continue
+
+            if all(self._is_similar(a, b) for a, b in zip(key[1:], cached_key[1:])):
+                return cached_key
+
+        return None
+
+    def _is_similar(self, a, b) -> bool:
+        if isinstance(a, ImageKey) and isinstance(b, ImageKey) and a.kind == b.kind == 'dhash':
+            return abs(a.width - b.width) <= self.max_size_delta \
+                   and abs(a.height - b.height) <= self.max_size_delta \
+                   and bin(a.digest ^ b.digest).count('1') <= self.max_distance
+
+        return a == b
+
+    def _entry_path(self, key: tuple) -> str:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.path, name)
+
+    def _load(self, key: tuple):
+        if self.path is None:
+            return None
+
+        entry_path = self._entry_path(key)
+
+        try:
+            with open(entry_path, 'rb') as file:
+                value = pickle.load(file)
+
+            # The modification time is the last use for the eviction
+            os.utime(entry_path)
+            return value
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _store(self, key: tuple, value):
+        if self.path is None:
+            return
+
+        # Write to a temporary file first so a concurrent reader never sees a partial entry
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(temp_path, 'wb') as file:
+                pickle.dump(value, file)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            return
+
+        self._evict_disk()
+
+    def _evict_disk(self):
+        # The directory is listed every time, other processes (e.g. the batch workers) store to it too
+        try:
+            entries = [entry for entry in os.scandir(self.path) if not entry.name.endswith('.tmp')]
+        except OSError:
+            return
+
+        if len(entries) <= self.max_disk_size:
+            return
+
+        def last_use(entry):
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0
+
+        entries.sort(key=last_use)
+        for entry in entries[:len(entries) - self.max_disk_size]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def _difference_hash(image: Image.Image, size=8) -> int:
+    """ 64 bit dHash, compares the brightness of horizontally adjacent pixels of a tiny grayscale copy """
+    pixels = list(image.convert('L').resize((size + 1, size), Image.BILINEAR).getdata())
+
+    value = 0
+    for row in range(size):
+        for column in range(size):
+            left = pixels[row * (size + 1) + column]
+            right = pixels[row * (size + 1) + column + 1]
+            value = (value << 1) | (left > right)
+
+    return value
+
+
+ocr_cache = OcrCache()
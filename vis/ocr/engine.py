@@ -0,0 +1,147 @@
+import re
+import pytesseract
+
+from threading import Lock
+from contextlib import contextmanager
+from PIL import Image
+
+try:
+    # In-process bindings to the tesseract C++ API, optional
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+__all__ = ('OcrEngine', 'TesserocrEngine', 'PytesseractEngine', 'get_engine')
+
+
+class OcrEngine:
+    """ Common interface of the tesseract backends """
+
+    name = 'base'
+
+    # Height of the bands of the streamed retrieval, a band is a separate call
+    stream_band_height = 300
+
+    def image_to_string(self, image, lang: str) -> str:
+        raise NotImplementedError
+
+    def image_to_data(self, image, lang: str) -> str:
+        """ Returns tesseract TSV output """
+        raise NotImplementedError
+
+    def detect_script(self, image) -> str:
+        """ Returns the script name found by tesseract osd, None if it can't be detected """
+        raise NotImplementedError
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    Keeps initialized tesseract api handles alive for every language set, so the traineddata is loaded
+    only once and images are passed to tesseract directly from memory.
+
+    A handle can't be used by two threads at the same time, so every language set has its own pool of
+    idle handles and a new one is created only when all of them are busy.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        self._lock = Lock()
+        self._idle_apis: dict[tuple, list] = {}
+
+    @contextmanager
+    def _api(self, lang: str, psm=None):
+        if psm is None:
+            psm = tesserocr.PSM.AUTO
+
+        key = (lang, psm)
+
+        with self._lock:
+            idle = self._idle_apis.setdefault(key, [])
+            api = idle.pop() if idle else None
+
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+
+        try:
+            yield api
+        finally:
+            api.Clear()
+            with self._lock:
+                self._idle_apis[key].append(api)
+
+    @staticmethod
+    def _set_image(api, image):
+        if isinstance(image, Image.Image):
+            api.SetImage(image)
+            return
+
+        # NumPy buffer, HxW or HxWxC uint8
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, bytes_per_pixel * width)
+
+    def image_to_string(self, image, lang: str) -> str:
+        with self._api(lang) as api:
+            self._set_image(api, image)
+            return api.GetUTF8Text()
+
+    def image_to_data(self, image, lang: str) -> str:
+        with self._api(lang) as api:
+            self._set_image(api, image)
+            return api.GetTSVText(0)
+
+    def detect_script(self, image) -> str:
+        with self._api('osd', tesserocr.PSM.OSD_ONLY) as api:
+            self._set_image(api, image)
+            osd = api.DetectOrientationScript()
+
+        return osd['script_name'] if osd else None
+
+    def close(self):
+        with self._lock:
+            for apis in self._idle_apis.values():
+                for api in apis:
+                    api.End()
+            self._idle_apis.clear()
+
+
+class PytesseractEngine(OcrEngine):
+    """ Fallback backend, runs the tesseract binary for every call """
+
+    name = 'pytesseract'
+
+    # Every call starts tesseract and loads the traineddata again, bands are coarse to pay it rarely
+    stream_band_height = 1200
+
+    def image_to_string(self, image, lang: str) -> str:
+        return pytesseract.image_to_string(image, lang=lang)
+
+    def image_to_data(self, image, lang: str) -> str:
+        return pytesseract.image_to_data(image, lang=lang)
+
+    def detect_script(self, image) -> str:
+        try:
+            # Can raise TesseractError with too few characters
+            # TODO: Save image manually with resolution meta
+            osd = pytesseract.image_to_osd(image)
+        except pytesseract.TesseractError:
+            return None
+
+        match = re.search("Script: ([a-zA-Z]+)\n", osd)
+        return match.group(1) if match else None
+
+
+_engine: OcrEngine = None
+_engine_lock = Lock()
+
+
+def get_engine() -> OcrEngine:
+    """ Returns the shared engine, in-process one if tesserocr is installed """
+    global _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = TesserocrEngine() if tesserocr is not None else PytesseractEngine()
+
+    return _engine
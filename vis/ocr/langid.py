@@ -0,0 +1,195 @@
+import math
+import unicodedata
+
+from collections import Counter
+
+__all__ = ('identify_language', 'text_script', 'PROFILE_LANGUAGES')
+
+# Compact profiles of the tesseract languages: script, alphabet and the most common words of general
+# text in frequency order, no domain vocabulary. Trigram weights are derived from the words once, on
+# the first use.
+_PROFILES = {
+    'eng': ('Latin', "abcdefghijklmnopqrstuvwxyz",
+            "the of and to in is that it was for on are with as his they be at one have this from "
+            "by not but what all were when we there can an your which their said if do will each "
+            "about how up out them then she many some so these would other into has more her two "
+            "like him see time could no make than first been its who now people my made over did "
+            "down only way find use may water long little very after words called just where most "
+            "know get through back much before go good new write our me man too any day same right "
+            "look think also around another came come work three must because does part even place "
+            "well such here take why help put different away again off went old number"),
+    'deu': ('Latin', "abcdefghijklmnopqrstuvwxyzäöüß",
+            "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch "
+            "es an werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über "
+            "einen so zum war haben nur oder aber vor zur bis mehr durch man sein wurde sei ich "
+            "können ihre schon wenn hatte kann gegen vom müssen jetzt ihr wir dann keine seine "
+            "unter diese wo immer alle zwei ihm ihn wieder sehr hier heute damit ohne also gibt "
+            "sollte habe neue ob selbst zeit jahr mir uns waren doch bereits viele"),
+    'fra': ('Latin', "abcdefghijklmnopqrstuvwxyzàâæçéèêëîïôœùûüÿ",
+            "de la le et les des en un du une que est pour qui dans par plus pas au sur ne se ce "
+            "il sont avec mais comme ou son elle nous vous être fait leur ses tout bien aussi "
+            "cette était peut même où très sans deux après on y ont été avait lui si entre sa ces "
+            "aux leurs faire dont encore tous autre avant depuis peu moins alors ici donc je tu "
+            "toujours chez quand bon temps cela rien"),
+    'spa': ('Latin', "abcdefghijklmnopqrstuvwxyzáéíñóúü",
+            "de la que el en y a los se del las un por con no una su para es al lo como más o pero "
+            "sus le ha me si sin sobre este ya entre cuando todo esta ser son dos también fue "
+            "había era muy años hasta desde está mi porque qué sólo han yo hay vez puede todos así "
+            "nos ni parte tiene él uno donde bien tiempo mismo ese ahora cada e vida otro después "
+            "te otros aunque esa eso hace otra tan durante siempre día tanto ella tres sí dijo "
+            "sido gran según menos"),
+    'ita': ('Latin', "abcdefghijklmnopqrstuvwxyzàèéìíòóù",
+            "di e il la che in un a per è non una del le si con i da sono al come dei ma più lo "
+            "anche della gli ha alla nel questo se delle o tra essere mi suo quando molto tutto "
+            "stato nella ci cosa fatto può perché suoi sua dopo ancora loro anni ne io tutti "
+            "questa fare così solo due sempre ogni prima già senza dove quella hanno era fra cui "
+            "poi noi tempo mentre qui bene fino degli nei"),
+    'por': ('Latin', "abcdefghijklmnopqrstuvwxyzáâãàçéêíóôõú",
+            "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi "
+            "ao ele das tem à seu sua ou ser quando muito há nos já está eu também só pelo pela "
+            "até isso ela entre era depois sem mesmo aos ter seus quem nas me esse eles estão você "
+            "tinha foram essa num nem suas meu às minha têm numa pelos elas havia seja qual será "
+            "nós tenho lhe deles essas esses pelas este fosse dele"),
+    'nld': ('Latin', "abcdefghijklmnopqrstuvwxyzéëïóöü",
+            "de en van het een in is dat op te zijn met voor niet aan er om ook als maar bij door "
+            "nog uit dan wel naar over ze hij zich kan wordt worden was heeft deze tot geen wat "
+            "die hebben zo al je we ik moet of hun meer nu werd zal veel kunnen twee jaar onder "
+            "tegen alleen na waar hier omdat toen zou men dit zij wie"),
+    'pol': ('Latin', "aąbcćdeęfghijklłmnńoóprsśtuwyzźż",
+            "i w na z do nie się że to jest o a jak po co ale tak od za jego przez dla są już "
+            "tylko jej może przy być był czy tego które został także oraz bardzo jeszcze ich go "
+            "tym jednak mu ten który ma pod lub gdy nawet też bo kiedy tej we były było można "
+            "teraz więc sobie mnie ja ty my wszystko jako nad bez tu gdzie"),
+    'ces': ('Latin', "abcdefghijklmnopqrstuvwxyzáčďéěíňóřšťúůýž",
+            "a se na v je že to s z o do jako by k pro ale jsou jeho tak po které jak už bylo není "
+            "jen také který při být byl od nebo jsem ve za co aby podle jsme i mu ho když tam ta "
+            "ten tento toho však než ještě mezi jejich bude může byla jí ze až své svůj my vy já "
+            "ty tady"),
+    'tur': ('Latin', "abcçdefgğhıijklmnoöprsştuüvyz",
+            "ve bir bu da de için ile çok ne daha gibi olarak olan en ama kadar sonra her şey ben "
+            "değil o var mi ya biz onun bunu olduğu yok zaman sen siz onlar ki şu iki büyük yeni "
+            "ilk önce bile diye kendi şimdi hiç nasıl neden bana sana göre başka yıl bütün"),
+    'rus': ('Cyrillic', "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+            "и в не на я что он с как а то это по к но все она так его из у же ты вы за бы от мне "
+            "о было был для есть когда если уже только или нет они мы даже ещё быть сказал да вот "
+            "её может до ну при где там чтобы них их кто меня этого время очень себя ни который "
+            "тут теперь один будет потом тоже надо без раз"),
+    'ukr': ('Cyrillic', "абвгґдеєжзиіїйклмнопрстуфхцчшщьюя'",
+            "і в на не що з у та до я а він як це за по ти але все його так від вона для ми вони "
+            "їх є був також щоб ще який коли якщо бути тільки або вже ж бо мене мені її тому дуже "
+            "теж де тут було була може час там яка які свої свою один цей ця наш"),
+    'bel': ('Cyrillic', "абвгдеёжзійклмнопрстуўфхцчшыьэюя'",
+            "і ў на не што з у да а я як гэта ён па але так яго ад яна для мы яны ёсць быў таксама "
+            "каб яшчэ які калі толькі ці ўжо быць усе вельмі было была можна мяне мне яе таму тут "
+            "там дзе час адзін гэты гэтая наш пра праз без"),
+    'bul': ('Cyrillic', "абвгдежзийклмнопрстуфхцчшщъьюя",
+            "и на в да се не е за от с че по са като но то той го ще със му ми което беше към това "
+            "един една има или тя още много така аз ти ние вие те след при до може всички бил била "
+            "който която където когато защото само сега тук там време две години"),
+    'srp': ('Cyrillic', "абвгдђежзијклљмнњопрстћуфхцчџш",
+            "и у је да на се за не са од који о из као ће то а по али био су до што ја ли или само "
+            "све јер када бити га још може ми си сам смо они она он нас њега њих код где после пре "
+            "без тако овај ова ово нису била било тада сада време године два"),
+    'mkd': ('Cyrillic', "абвгдѓежзѕијклљмнњопрстќуфхцчџш",
+            "и на во се да не е за од со што ќе ги ја го тоа тој таа како но по беше кој која има "
+            "многу сè уште или само јас ти ние вие тие кога каде зошто сега тука таму време години "
+            "два една еден може бидејќи меѓу пред после без сите"),
+    'aze_cyrl': ('Cyrillic', "абвгғдеәжзиыјкҝлмноөпрстуүфхһчҹш",
+                 "вә бу бир да дә илә үчүн о чох ки олан олараг мән сән биз онун бүтүн даһа һәр ән "
+                 "кими ики нә әмма вар јох сиз онлар өз белә сонра биринҹи јени бөјүк олду"),
+    'uzb_cyrl': ('Cyrillic', "абвгдеёжзийклмнопрстуфхцчшъэюяўқғҳ",
+                 "ва бу бир билан учун ҳам да эди бўлган деб ҳақида кўп ўз эмас мен сен биз улар "
+                 "бор йўқ ҳар энг каби нима лекин ёки кейин биринчи янги катта бўлди"),
+}
+
+PROFILE_LANGUAGES = frozenset(_PROFILES)
+
+# Weights of the score parts
+WORD_WEIGHT = 2
+ALPHABET_PENALTY = 8
+
+# The best language must lead the second one by this score, otherwise the text is too ambiguous.
+# Short texts (single UI words) share trigrams with many languages by chance, they need a lead that
+# only letters outside of the other alphabets give
+MIN_MARGIN = 0.1
+SHORT_TEXT_LETTERS = 10
+SHORT_TEXT_MARGIN = 0.5
+
+_trigram_weights: dict = {}
+
+
+def _trigrams(word: str) -> list:
+    padded = f" {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _profile_trigrams(lang: str) -> dict:
+    """ Trigram weights of the profile words, more common words weigh more. Max weight is 1 """
+    if lang not in _trigram_weights:
+        counts = Counter()
+        for rank, word in enumerate(_PROFILES[lang][2].split()):
+            for trigram in _trigrams(word):
+                counts[trigram] += 1 / math.sqrt(rank + 1)
+
+        top = max(counts.values())
+        _trigram_weights[lang] = {trigram: count / top for trigram, count in counts.items()}
+
+    return _trigram_weights[lang]
+
+
+def text_script(text: str):
+    """ The most common script of the letters, in tesseract naming (e.g. 'Latin'), None without letters """
+    scripts = Counter()
+
+    for char in text:
+        if char.isalpha():
+            try:
+                scripts[unicodedata.name(char).split()[0].capitalize()] += 1
+            except ValueError:
+                continue
+
+    return min(scripts, key=lambda script: (-scripts[script], script)) if scripts else None
+
+
+def _score(lang: str, letters: list, words: list, trigrams: list) -> float:
+    _, alphabet, profile_words = _PROFILES[lang]
+
+    out_of_alphabet = sum(1 for letter in letters if letter not in alphabet) / len(letters)
+
+    weights = _profile_trigrams(lang)
+    trigram_score = sum(weights.get(trigram, 0) for trigram in trigrams) / max(1, len(trigrams))
+
+    common_words = set(profile_words.split())
+    word_score = sum(1 for word in words if word in common_words) / max(1, len(words))
+
+    return trigram_score + WORD_WEIGHT * word_score - ALPHABET_PENALTY * out_of_alphabet
+
+
+def identify_language(text: str, candidates=None):
+    """
+    Returns the tesseract code of the text language or None if it can't be identified.
+    Deterministic: candidates are narrowed down by the script of the text and the rest are scored
+    by their alphabet, common words and trigrams. None is returned too if the best score doesn't
+    lead the second one by `MIN_MARGIN` (`SHORT_TEXT_MARGIN` for short texts).
+    """
+    script = text_script(text)
+    if script is None:
+        return None
+
+    languages = sorted(lang for lang in (PROFILE_LANGUAGES if candidates is None else candidates)
+                       if lang in _PROFILES and _PROFILES[lang][0] == script)
+
+    if len(languages) <= 1:
+        return languages[0] if languages else None
+
+    lowered = text.lower()
+    letters = [char for char in lowered if char.isalpha()]
+    words = [''.join(char for char in word if char.isalpha() or char == "'") for word in lowered.split()]
+    words = [word for word in words if word]
+    trigrams = [trigram for word in words for trigram in _trigrams(word)]
+
+    scores = sorted(((_score(lang, letters, words, trigrams), lang) for lang in languages), reverse=True)
+    (best_score, best), (second_score, _) = scores[0], scores[1]
+
+    margin = SHORT_TEXT_MARGIN if len(letters) < SHORT_TEXT_LETTERS else MIN_MARGIN
+    return best if best_score - second_score >= margin else None
@@ -1,25 +1,126 @@
+import os
+import re
+import json
+import shutil
+import subprocess
 import pytesseract
 
-__all__ = ('SUPPORTED_OCR_LANGUAGES', 'SCRIPT_LANGUAGES', 'ALL_LANGUAGE')
+from vis.languages import LONG_LANGUAGE_CODES
 
+__all__ = ('SUPPORTED_OCR_LANGUAGES', 'SCRIPT_LANGUAGES', 'ALL_LANGUAGE', 'to_ocr_language')
 
-def _supported_script_languages(script_dict: dict) -> dict:
+# Installed languages are probed once and cached until tesseract or its tessdata changes
+CACHE_PATH = "temp/tesseract_languages.json"
+
+SCRIPT_LANGUAGE_CANDIDATES = {
+    'Cyrillic': ['rus', 'bel', 'srp', 'ukr', 'mkd', 'bul', 'aze_cyrl', 'uzb_cyrl'],
+    'Latin': ['eng', 'ces']
+}
+
+
+def _mtime(path: str):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+
+
+def _tesseract_binary() -> str:
+    binary = shutil.which(pytesseract.pytesseract.tesseract_cmd)
+
+    if binary is None:
+        raise pytesseract.TesseractNotFoundError()
+
+    return binary
+
+
+def _probe_languages(binary: str) -> tuple:
+    """ Returns tessdata path and installed languages, the same way as `pytesseract.get_languages()` """
+    output = subprocess.run([binary, '--list-langs'], capture_output=True, text=True).stdout
+    lines = output.splitlines()
+
+    match = re.search(r'"(.*)"', lines[0]) if lines else None
+    tessdata = match.group(1) if match else os.environ.get('TESSDATA_PREFIX')
+
+    return tessdata, [line.strip() for line in lines[1:] if line.strip()]
+
+
+def _supported_script_languages(supported_languages: set) -> dict:
     out_dict = {}
 
-    for script, languages in script_dict.items():
-        supported_languages = SUPPORTED_OCR_LANGUAGES.intersection(languages)
-        if len(supported_languages) > 0:
-            out_dict[script] = supported_languages
+    for script, languages in SCRIPT_LANGUAGE_CANDIDATES.items():
+        script_languages = supported_languages.intersection(languages)
+        if len(script_languages) > 0:
+            out_dict[script] = sorted(script_languages)
 
     return out_dict
 
 
-SUPPORTED_OCR_LANGUAGES = set(pytesseract.get_languages())
+def _load_cache(binary: str):
+    try:
+        with open(CACHE_PATH, encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
 
+    valid = (cache.get('binary') == binary and cache.get('binary_mtime') == _mtime(binary)
+             and cache.get('tessdata_mtime') == _mtime(cache.get('tessdata'))
+             and cache.get('candidates') == SCRIPT_LANGUAGE_CANDIDATES)
+
+    return cache if valid else None
 
-SCRIPT_LANGUAGES = _supported_script_languages({
-    'Cyrillic': ['rus', 'bel', 'srp', 'ukr', 'mkd', 'bul', 'aze_cyrl', 'uzb_cyrl'],
-    'Latin': ['eng', 'cez']
-})
+
+def _store_cache(cache: dict):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+    except OSError:
+        pass
+
+
+def get_installed_languages() -> dict:
+    """
+    Returns installed tesseract languages and their scripts, from the cache if tesseract and its
+    tessdata weren't modified since. Raises TesseractNotFoundError if tesseract is missing.
+    """
+    binary = _tesseract_binary()
+
+    cache = _load_cache(binary)
+    if cache is not None:
+        return cache
+
+    tessdata, languages = _probe_languages(binary)
+    cache = {"binary": binary, "binary_mtime": _mtime(binary),
+             "tessdata": tessdata, "tessdata_mtime": _mtime(tessdata),
+             "candidates": SCRIPT_LANGUAGE_CANDIDATES,
+             "languages": languages,
+             "script_languages": _supported_script_languages(set(languages))}
+
+    _store_cache(cache)
+    return cache
+
+
+try:
+    _installed = get_installed_languages()
+except pytesseract.TesseractNotFoundError:
+    _installed = {"languages": [], "script_languages": {}}
+
+
+SUPPORTED_OCR_LANGUAGES = set(_installed['languages'])
+
+# Sorted lists, so ALL_LANGUAGE has the same order in every process
+SCRIPT_LANGUAGES = {script: sorted(languages) for script, languages in _installed['script_languages'].items()}
 
 ALL_LANGUAGE = '+'.join('+'.join(languages) for languages in SCRIPT_LANGUAGES.values())
+
+
+def to_ocr_language(short_lang: str):
+    """ Installed tesseract language of a 639-1 code, its script variant if only that is installed """
+    long_lang = LONG_LANGUAGE_CODES.get(short_lang)
+
+    if long_lang is None or long_lang in SUPPORTED_OCR_LANGUAGES:
+        return long_lang
+
+    variants = sorted(lang for lang in SUPPORTED_OCR_LANGUAGES if lang.startswith(f"{long_lang}_"))
+    return variants[0] if variants else None
@@ -0,0 +1,144 @@
+import numpy as np
+
+from PIL import Image
+
+from vis.utils.colors import get_background_foreground
+
+__all__ = ('find_text_regions', 'crop_to_text')
+
+# Images with less pixels are retrieved as is, the detection wouldn't pay off
+MIN_CROP_AREA = 250_000
+
+# Detection runs on a copy downsampled to this size
+DETECTION_SIZE = 800
+
+# Brightness difference of neighbour pixels that is considered a glyph edge, a share of the image
+# contrast between these bounds, so gray text on a gray background has edges too
+EDGE_CONTRAST_RATIO = 0.3
+MIN_EDGE_CONTRAST = 8
+MAX_EDGE_CONTRAST = 40
+
+# Minimal share of edge pixels in a text block
+MIN_EDGE_DENSITY = 0.08
+
+# Space between the packed regions, so tesseract keeps regions of a row and rows apart as blocks
+REGION_SPACING = 32
+ROW_SPACING = 16
+
+
+def _runs(mask: np.ndarray, max_gap: int) -> list:
+    """ Returns (start, end) of the True runs, runs separated by at most `max_gap` are merged """
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    changes = np.flatnonzero(np.diff(padded))
+    starts, ends = changes[0::2], changes[1::2]
+
+    runs = []
+    for start, end in zip(starts, ends):
+        if runs and start - runs[-1][1] <= max_gap:
+            runs[-1] = (runs[-1][0], end)
+        else:
+            runs.append((start, end))
+
+    return runs
+
+
+def edge_threshold(pixels: np.ndarray) -> float:
+    """ Glyph edge threshold of grayscale pixels, relative to their contrast """
+    low, high = np.percentile(pixels, (1, 99))
+    return min(MAX_EDGE_CONTRAST, max(MIN_EDGE_CONTRAST, (high - low) * EDGE_CONTRAST_RATIO))
+
+
+def find_text_regions(image: Image.Image, padding=6) -> list:
+    """
+    Finds text blocks with edge projection profiles: rows with glyph edges form text bands,
+    columns with edges inside a band form blocks. Returns (left, top, right, bottom) boxes.
+    """
+    gray = image.convert('L')
+
+    factor = max(1, -(-max(image.size) // DETECTION_SIZE))
+    if factor > 1:
+        gray = gray.reduce(factor)
+
+    pixels = np.asarray(gray, dtype=np.int16)
+    threshold = edge_threshold(pixels)
+
+    edges = np.zeros(pixels.shape, dtype=bool)
+    edges[:, 1:] |= np.abs(np.diff(pixels, axis=1)) > threshold
+    edges[1:, :] |= np.abs(np.diff(pixels, axis=0)) > threshold
+
+    # Gaps are scaled with the downsample, a space between words or lines doesn't split a block
+    row_gap = max(1, 12 // factor)
+    column_gap = max(2, 24 // factor)
+
+    boxes = []
+    for top, bottom in _runs(edges.sum(axis=1) > 1, row_gap):
+        for left, right in _runs(edges[top:bottom].any(axis=0), column_gap):
+            # Lone specks and lines are not text
+            if bottom - top < 2 or right - left < 2:
+                continue
+
+            # Glyphs are dense with edges, solid shapes have them only on the outline
+            if edges[top:bottom, left:right].mean() < MIN_EDGE_DENSITY:
+                continue
+
+            boxes.append((max(0, int(left) * factor - padding), max(0, int(top) * factor - padding),
+                          min(image.width, int(right) * factor + padding),
+                          min(image.height, int(bottom) * factor + padding)))
+
+    return boxes
+
+
+def _group_rows(boxes: list) -> list:
+    """ Groups the boxes to rows of vertically overlapping ones, rows from the top, boxes from the left """
+    rows = []
+
+    for box in sorted(boxes, key=lambda box: (box[1], box[0])):
+        if rows and box[1] < rows[-1][1]:
+            rows[-1][0].append(box)
+            rows[-1][1] = max(rows[-1][1], box[3])
+        else:
+            rows.append([[box], box[3]])
+
+    return [sorted(row) for row, _ in rows]
+
+
+def crop_to_text(image: Image.Image) -> tuple:
+    """
+    Packs the text regions into a smaller image: regions of a row are placed side by side and rows
+    are stacked from the top, the gaps are filled with the background color. Regions keep their
+    padding, so text at their edges isn't cut. Returns the packed image and the (region box, position
+    in the packed image) pairs; the image itself and no pairs if no text is found or packing doesn't
+    make it smaller.
+    """
+    if image.width * image.height < MIN_CROP_AREA:
+        return image, []
+
+    boxes = find_text_regions(image)
+    if len(boxes) == 0:
+        return image, []
+
+    layout = []
+    width = height = 0
+
+    for row in _group_rows(boxes):
+        row_top = min(box[1] for box in row)
+        x = 0
+
+        for box in row:
+            layout.append((box, (x, height + box[1] - row_top)))
+            x += box[2] - box[0] + REGION_SPACING
+
+        width = max(width, x - REGION_SPACING)
+        height += max(box[3] for box in row) - row_top + ROW_SPACING
+
+    height -= ROW_SPACING
+    if width * height >= image.width * image.height:
+        return image, []
+
+    background, _ = get_background_foreground(image)
+    packed = Image.new('RGB', (width, height), background)
+
+    for box, position in layout:
+        packed.paste(image.crop(box), position)
+
+    return packed, layout
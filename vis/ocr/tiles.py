@@ -0,0 +1,165 @@
+import numpy as np
+import multiprocessing
+
+from threading import Lock
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+from .engine import get_engine
+from .regions import edge_threshold, _runs
+from .words import parse_tsv
+
+__all__ = ('split_into_bands', 'image_to_string', 'image_to_words', 'iter_band_words', 'set_workers')
+
+# Smaller images are retrieved in a single tesseract run
+MIN_TILED_HEIGHT = 1000
+MIN_TILED_AREA = 1_000_000
+
+# Block numbers of a band are shifted by this, so blocks of different bands never merge
+BAND_BLOCK_STEP = 10_000
+
+# The tiling is disabled by default: spawned workers import the main module, so only scripts with
+# a `__main__` guard (the tray app, the standalone service) enable it with `set_workers()`
+_workers = 1
+_pool: ProcessPoolExecutor = None
+_pool_lock = Lock()
+
+
+def set_workers(workers: int):
+    """
+    Sets the size of the process pool, 1 disables the tiling. Call it only from a script with
+    a `__main__` guard, the workers are spawned and import the main module.
+    """
+    global _workers, _pool
+
+    with _pool_lock:
+        _workers = max(1, workers)
+
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # Spawned instead of forked, a fork would copy the locks of the running threads
+            _pool = ProcessPoolExecutor(_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    return _pool
+
+
+def _should_tile(image: Image.Image) -> bool:
+    return _workers > 1 and image.height >= MIN_TILED_HEIGHT and image.width * image.height >= MIN_TILED_AREA
+
+
+def split_into_bands(image: Image.Image, band_count: int) -> list:
+    """
+    Splits the image to about `band_count` horizontal (top, bottom) bands. Cuts are made only in the
+    middle of empty gaps between text lines, the widest gap near the wanted cut position is preferred,
+    so bands tend to end at paragraph breaks.
+    """
+    gray = np.asarray(image.convert('L'), dtype=np.int16)
+    ink_rows = (np.abs(np.diff(gray, axis=1)) > edge_threshold(gray)).any(axis=1)
+
+    lines = _runs(ink_rows, max_gap=1)
+    if band_count < 2 or len(lines) < 2:
+        return [(0, image.height)]
+
+    # (gap size, cut position) between every two lines
+    gaps = [(int(lines[i + 1][0] - lines[i][1]), int(lines[i][1] + lines[i + 1][0]) // 2)
+            for i in range(len(lines) - 1)]
+
+    target = image.height / band_count
+    cuts = [0]
+
+    while image.height - cuts[-1] >= target * 1.5:
+        candidates = [gap for gap in gaps if cuts[-1] + target * 0.5 <= gap[1] <= cuts[-1] + target * 1.5]
+
+        if len(candidates) == 0:
+            # Lines are taller than the band, take the next gap whatever it is
+            candidates = [gap for gap in gaps if gap[1] > cuts[-1] + target * 1.5][:1]
+
+        if len(candidates) == 0:
+            break
+
+        # The widest gap, the closest one to the wanted position of equal ones
+        wanted = cuts[-1] + target
+        cuts.append(max(candidates, key=lambda gap: (gap[0], -abs(gap[1] - wanted)))[1])
+
+    cuts.append(image.height)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _retrieve_band_data(band: Image.Image, lang: str) -> str:
+    # Runs in a worker process, every worker keeps its own engine
+    return get_engine().image_to_data(band, lang)
+
+
+def _retrieve_band_string(band: Image.Image, lang: str) -> str:
+    return get_engine().image_to_string(band, lang)
+
+
+def _map_bands(method, image: Image.Image, lang: str) -> tuple:
+    bands = split_into_bands(image, _workers)
+    images = [image.crop((0, top, image.width, bottom)) for top, bottom in bands]
+
+    return bands, list(_get_pool().map(method, images, [lang] * len(images)))
+
+
+def _band_words(tsv: str, top: int, index: int) -> list:
+    """ Parsed words of a band, moved to the image coordinates """
+    return [replace(word, top=word.top + top, block=word.block + index * BAND_BLOCK_STEP) for word in parse_tsv(tsv)]
+
+
+def image_to_words(image: Image.Image, lang: str) -> list:
+    """ Parsed words of the image, large images are retrieved band by band in parallel """
+    if not _should_tile(image):
+        return parse_tsv(get_engine().image_to_data(image, lang))
+
+    bands, results = _map_bands(_retrieve_band_data, image, lang)
+
+    words = []
+    for index, ((top, _), tsv) in enumerate(zip(bands, results)):
+        words.extend(_band_words(tsv, top, index))
+
+    return words
+
+
+def iter_band_words(image: Image.Image, lang: str, band_height=None):
+    """
+    Yields parsed words of the image band by band from the top, so the first lines are available
+    long before the whole image is retrieved. Bands are about `band_height` high, the
+    `stream_band_height` of the engine by default. Bands of a large image run in parallel if the
+    process pool is enabled, a small one isn't worth the transfer to the workers.
+    """
+    bands = split_into_bands(image, image.height // (band_height or get_engine().stream_band_height))
+    images = [image.crop((0, top, image.width, bottom)) for top, bottom in bands]
+
+    if not _should_tile(image) or len(bands) == 1:
+        for index, ((top, _), band) in enumerate(zip(bands, images)):
+            yield _band_words(get_engine().image_to_data(band, lang), top, index)
+        return
+
+    futures = [_get_pool().submit(_retrieve_band_data, band, lang) for band in images]
+
+    try:
+        for index, ((top, _), future) in enumerate(zip(bands, futures)):
+            yield _band_words(future.result(), top, index)
+    finally:
+        # The consumer may stop early
+        for future in futures:
+            future.cancel()
+
+
+def image_to_string(image: Image.Image, lang: str) -> str:
+    """ Text of the image, large images are retrieved band by band in parallel """
+    if not _should_tile(image):
+        return get_engine().image_to_string(image, lang)
+
+    # Bands are separate paragraphs, the same as their blocks in `image_to_words()`
+    _, results = _map_bands(_retrieve_band_string, image, lang)
+    return '\n\n'.join(text.strip('\n\f') for text in results if text.strip())
@@ -1,11 +1,14 @@
-from pytesseract import get_languages, TesseractNotFoundError
+from pytesseract import TesseractNotFoundError
+
+from .languages import get_installed_languages
 
 TESSERACT_PATH_FILE = "../tesseract_path.txt"
 
 
 def verify_tesseract_installed():
     try:
-        get_languages()
+        # Cached, doesn't run tesseract unless it was changed
+        get_installed_languages()
     except TesseractNotFoundError:
         print("Tesseract not installed!")
         exit()
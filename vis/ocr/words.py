@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from itertools import groupby
+
+__all__ = ('OcrWord', 'parse_tsv', 'group_lines', 'words_to_text', 'mean_confidence', 'line_bounding_box')
+
+
+@dataclass
+class OcrWord:
+    """ Single word of tesseract TSV output """
+    text: str
+    conf: float
+    block: int
+    par: int
+    line: int
+    left: int
+    top: int
+    width: int
+    height: int
+
+    @property
+    def line_key(self) -> tuple:
+        return self.block, self.par, self.line
+
+
+def parse_tsv(tsv: str) -> list:
+    """ Parses words from tesseract TSV output, other levels and empty words are skipped """
+    words = []
+
+    for row in tsv.splitlines()[1:]:
+        columns = row.split('\t')
+
+        # level page block par line word left top width height conf text
+        if len(columns) < 12 or columns[0] != '5' or not columns[11].strip():
+            continue
+
+        words.append(OcrWord(text=columns[11], conf=float(columns[10]),
+                             block=int(columns[2]), par=int(columns[3]), line=int(columns[4]),
+                             left=int(columns[6]), top=int(columns[7]),
+                             width=int(columns[8]), height=int(columns[9])))
+
+    return words
+
+
+def group_lines(words: list) -> list:
+    """ Groups words to lines in reading order """
+    return [list(line) for _, line in groupby(words, key=lambda word: word.line_key)]
+
+
+def words_to_text(words: list) -> str:
+    """ Joins words the same way tesseract does: lines with a newline, paragraphs with an empty line """
+    text = ''
+    prev_key = None
+
+    for line in group_lines(words):
+        key = line[0].line_key
+
+        if prev_key is not None:
+            text += '\n' if key[:2] == prev_key[:2] else '\n\n'
+
+        text += ' '.join(word.text for word in line)
+        prev_key = key
+
+    return text
+
+
+def mean_confidence(words: list) -> float:
+    if len(words) == 0:
+        return 0
+
+    return sum(word.conf for word in words) / len(words)
+
+
+def line_bounding_box(line: list, padding=0) -> tuple:
+    left = min(word.left for word in line) - padding
+    top = min(word.top for word in line) - padding
+    right = max(word.left + word.width for word in line) + padding
+    bottom = max(word.top + word.height for word in line) + padding
+
+    return max(0, left), max(0, top), right, bottom
@@ -0,0 +1,273 @@
+"""
+Local HTTP service of the warm OCR and translation pipeline, so other tools on the same machine
+reuse the loaded tesseract, the translator session and the caches instead of starting their own.
+
+    POST /ocr?mode=normal[&lang=en]   body: image file bytes   -> {"text", "lang", "ms"}
+    POST /translate   body: {"text", "from", "to"}             -> {"translation", "ms"}
+    GET  /health                                               -> load and cache stats
+    GET  /metrics                                              -> stage timings, Prometheus text
+
+Only `max_concurrency` requests are processed at the same time, the rest wait up to `queue_timeout`
+seconds for a slot and are answered with 503 and Retry-After then. The body is read only after a slot
+is taken, and connections over `max_connections` are closed right away.
+
+Web pages can send requests to localhost too: requests with an Origin header or a Host other than
+localhost (DNS rebinding) are refused with 403. With a `token`, every request must also carry
+`Authorization: Bearer <token>`.
+
+Run standalone: python -m vis.service [port] [max_concurrency], the token is read from VIS_SERVICE_TOKEN
+"""
+import io
+import os
+import sys
+import hmac
+import json
+import time
+
+from threading import Thread, Lock, BoundedSemaphore
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+__all__ = ('start_service', 'DEFAULT_PORT')
+
+DEFAULT_PORT = 8766
+
+# Larger request bodies are rejected without reading them
+MAX_BODY_SIZE = 32 * 1024 * 1024
+
+RETRIEVE_MODES = ('quality', 'normal', 'fast')
+
+ALLOWED_HOSTS = ('127.0.0.1', 'localhost')
+
+# Idle keep-alive connections are closed after this many seconds, so they don't hold connection slots
+CONNECTION_TIMEOUT = 10
+
+
+class _ServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, max_concurrency: int, queue_timeout: float, max_connections: int, token=None):
+        super().__init__(address, _ServiceHandler)
+
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.slots = BoundedSemaphore(max_concurrency)
+        self.connections = BoundedSemaphore(max_connections)
+        self.token = token
+
+        self._stats_lock = Lock()
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+
+    def process_request(self, request, client_address):
+        # Every connection is a thread, a flood of them is dropped instead of piling up threads
+        if not self.connections.acquire(blocking=False):
+            self.count('rejected')
+            self.shutdown_request(request)
+            return
+
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.connections.release()
+
+    def count(self, name: str, delta=1):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    @property
+    def stats(self) -> dict:
+        from vis.ocr import ocr_cache
+        from vis.translator import translation_cache
+
+        return {"status": "ok", "in_flight": self.in_flight, "max_concurrency": self.max_concurrency,
+                "served": self.served, "rejected": self.rejected,
+                "ocr_cache": ocr_cache.stats, "translation_cache": translation_cache.stats}
+
+
+class _RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _retrieve(body: bytes, params: dict) -> dict:
+    from PIL import Image, UnidentifiedImageError
+    from vis import ocr
+
+    try:
+        image = Image.open(io.BytesIO(body)).convert('RGB')
+    except (UnidentifiedImageError, OSError):
+        raise _RequestError(400, "body is not an image")
+
+    if 'lang' in params:
+        lang = ocr.to_ocr_language(params['lang'])
+        if lang is None:
+            raise _RequestError(400, f"language {params['lang']!r} is not installed")
+
+        return {"text": ocr.retrieve_text_with_lang(image, lang), "lang": params['lang']}
+
+    mode = params.get('mode', 'normal')
+    if mode not in RETRIEVE_MODES:
+        raise _RequestError(400, f"mode must be one of {', '.join(RETRIEVE_MODES)}")
+
+    retrieve = {'quality': ocr.retrieve_text_document_quality,
+                'normal': ocr.retrieve_text_document,
+                'fast': ocr.retrieve_text_document_fast}[mode]
+
+    document = retrieve(image)
+    return {"text": document.text, "lang": document.lang}
+
+
+def _translate(body: bytes, params: dict) -> dict:
+    from vis.translator import translate
+
+    try:
+        request = json.loads(body)
+        text, source, target = request['text'], request.get('from', 'auto'), request['to']
+    except (ValueError, KeyError, TypeError):
+        raise _RequestError(400, 'body must be JSON with "text", "to" and optional "from"')
+
+    return {"translation": translate(text, source, target)}
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = CONNECTION_TIMEOUT
+
+    ROUTES = {'/ocr': _retrieve, '/translate': _translate}
+
+    def do_GET(self):
+        if not self._is_allowed():
+            return
+
+        path = urlparse(self.path).path
+
+        if path == '/health':
+            self._send_json(200, self.server.stats)
+        elif path == '/metrics':
+            from vis.utils.timing import timings
+
+            body = timings.to_prometheus().encode()
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        route = self.ROUTES.get(url.path)
+
+        # The body stays unread in every early response, the connection can't be reused
+        if route is None:
+            self.close_connection = True
+            self._send_json(404, {"error": "not found"})
+            return
+
+        if not self._is_allowed():
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            self._send_json(413, {"error": f"body is larger than {MAX_BODY_SIZE} bytes"})
+            return
+
+        # Backpressure: a client retries later instead of piling up bodies and threads on a busy pipeline
+        if not self.server.slots.acquire(timeout=self.server.queue_timeout):
+            self.server.count('rejected')
+            self.close_connection = True
+            self._send_json(503, {"error": "busy"}, {'Retry-After': '1'})
+            return
+
+        self.server.count('in_flight')
+        start = time.perf_counter()
+
+        try:
+            body = self.rfile.read(length)
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+            status, response = 200, route(body, params)
+            response['ms'] = round((time.perf_counter() - start) * 1000, 1)
+        except _RequestError as error:
+            status, response = error.status, {"error": str(error)}
+        except Exception as exception:
+            status, response = 500, {"error": repr(exception)}
+        finally:
+            self.server.count('in_flight', -1)
+            self.server.slots.release()
+
+        self.server.count('served')
+        self._send_json(status, response)
+
+    def _is_allowed(self) -> bool:
+        """ Refuses requests of web pages and, with a token, of the clients without it """
+        host = self.headers.get('Host', '').rsplit(':', 1)[0].strip('[]')
+        token = self.server.token
+
+        if host not in ALLOWED_HOSTS or 'Origin' in self.headers:
+            error = "requests from web pages are not allowed"
+        elif token is not None and not hmac.compare_digest(self.headers.get('Authorization', ''),
+                                                           f"Bearer {token}"):
+            error = "a valid token is required"
+        else:
+            return True
+
+        self.close_connection = True
+        self._send_json(403, {"error": error})
+        return False
+
+    def _send_json(self, status: int, response: dict, headers=None):
+        body = json.dumps(response, ensure_ascii=False).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_service(port=DEFAULT_PORT, max_concurrency=4, queue_timeout=2.0, max_connections=32,
+                  token=None) -> ThreadingHTTPServer:
+    """ Starts the service on localhost in a daemon thread, port 0 picks a free one. Stop it with `shutdown()` """
+    server = _ServiceServer(('127.0.0.1', port), max_concurrency, queue_timeout, max_connections, token)
+
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    from vis import ocr, translator
+    from vis.ocr import tiles
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    max_concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    # Large images are split to bands on a process pool, only in the standalone service
+    tiles.set_workers(os.cpu_count() or 1)
+
+    # Requests shouldn't pay the startup cost
+    ocr.warm_up()
+    translator.warm_up()
+
+    server = start_service(port, max_concurrency, token=os.environ.get("VIS_SERVICE_TOKEN"))
+    print(f"Vis service is listening on http://127.0.0.1:{server.server_port}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
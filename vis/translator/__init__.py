@@ -1,11 +1,94 @@
-from deep_translator.exceptions import LanguageNotSupportedException
-from deep_translator import GoogleTranslator
+from threading import Lock
 
-from .langauges import *
+from .cache import translation_cache
+from .segments import translate_segments, split_paragraphs
+from vis.utils.timing import span, timed
+
+__all__ = ('translate', 'translate_stream', 'get_backend', 'set_backend', 'translation_cache', 'warm_up',
+           'SUPPORTED_TRANSLATOR_LANGUAGES')
+
+# deep_translator, requests and bs4 are slow to import, they are loaded on the first use
+_LAZY_ATTRIBUTES = {
+    'SUPPORTED_TRANSLATOR_LANGUAGES': 'langauges',
+    'TranslatorBackend': 'backends',
+    'HttpBackend': 'backends',
+    'GoogleBackend': 'backends',
+    'MockBackend': 'backends',
+}
+
+_backend = None
+_backend_lock = Lock()
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    return getattr(import_module(f"{__name__}.{_LAZY_ATTRIBUTES[name]}"), name)
+
+
+def get_backend():
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            from .backends import GoogleBackend
+            _backend = GoogleBackend()
+
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = backend
+
+    translation_cache.clear()
 
 
 def translate(text: str, from_lang: str, to_lang: str):
+    """ Translates the text line by line, only the lines that aren't cached yet are sent to the translator """
+    from deep_translator.exceptions import LanguageNotSupportedException
+
     try:
-        return GoogleTranslator(source=from_lang, target=to_lang).translate(text)
+        with span('translate'):
+            return translate_segments(text, from_lang, to_lang, _translate, translation_cache)
     except LanguageNotSupportedException:
         return "Language not supported!"
+
+
+def translate_stream(text: str, from_lang: str, to_lang: str):
+    """
+    Generator version of `translate()`. Yields the translation paragraph by paragraph, every part with
+    its leading line breaks, and returns the whole translation.
+    """
+    from deep_translator.exceptions import LanguageNotSupportedException
+
+    translation = ''
+
+    try:
+        for separator, part in split_paragraphs(text):
+            with span('translate'):
+                part_translation = separator + translate_segments(part, from_lang, to_lang, _translate,
+                                                                  translation_cache)
+            translation += part_translation
+            yield part_translation
+    except LanguageNotSupportedException:
+        yield "Language not supported!"
+        return "Language not supported!"
+
+    return translation
+
+
+@timed('translate.request')
+def _translate(text: str, from_lang: str, to_lang: str):
+    return get_backend().translate(text, from_lang, to_lang)
+
+
+def warm_up():
+    """ Imports the translator and opens its session ahead of the first translation """
+    get_backend()
@@ -0,0 +1,83 @@
+import requests
+
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from deep_translator.constants import GOOGLE_CODES_TO_LANGUAGES
+from deep_translator.exceptions import LanguageNotSupportedException, TranslationNotFound
+
+__all__ = ('TranslatorBackend', 'HttpBackend', 'GoogleBackend', 'MockBackend')
+
+
+class TranslatorBackend:
+    """ Common interface of the translation providers """
+
+    name = 'base'
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class HttpBackend(TranslatorBackend):
+    """
+    Base of the http providers. All requests share one keep-alive session with a connection pool,
+    every request has a (connect, read) timeout and failed requests are retried with exponential backoff.
+    """
+
+    def __init__(self, timeout=(3.05, 10), retries=3, backoff_factor=0.3, pool_size=8):
+        self.timeout = timeout
+
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET', 'POST'))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, **params) -> requests.Response:
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class GoogleBackend(HttpBackend):
+    """ Google translate mobile page, the same source as `deep_translator.GoogleTranslator` """
+
+    name = 'google'
+    url = "https://translate.google.com/m"
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        for lang in (source, target):
+            if lang != 'auto' and lang not in GOOGLE_CODES_TO_LANGUAGES:
+                raise LanguageNotSupportedException(lang)
+
+        if not text.strip():
+            return text
+
+        response = self.get(self.url, sl=source, tl=target, q=text)
+        element = BeautifulSoup(response.text, 'html.parser').find('div', {'class': 'result-container'})
+
+        if element is None:
+            raise TranslationNotFound(text)
+
+        return element.get_text(strip=True)
+
+
+class MockBackend(HttpBackend):
+    """ Client of `vis.translator.mock_server`, for offline tests and benchmarks """
+
+    name = 'mock'
+
+    def __init__(self, url="http://127.0.0.1:8765", **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        return self.get(f"{self.url}/translate", sl=source, tl=target, q=text).json()['translation']
@@ -0,0 +1,224 @@
+import os
+import time
+import sqlite3
+
+from threading import Lock
+from collections import OrderedDict
+from concurrent.futures import Future
+
+__all__ = ('TranslationCache', 'normalize_text', 'translation_cache')
+
+
+def normalize_text(text: str) -> str:
+    """ Collapses whitespace inside the lines, so the same text retrieved twice has the same key """
+    return '\n'.join(' '.join(line.split()) for line in text.strip().splitlines())
+
+
+class TranslationCache:
+    """
+    Cache of translations keyed by (normalized text, source, target).
+
+    The memory tier is an LRU limited by `max_size` entries, entries older than `ttl` seconds are
+    expired in both tiers. If `path` is given, translations are also stored in a SQLite database.
+    Concurrent requests of the same key are de-duplicated: only the first one calls the translator,
+    the rest wait for its result.
+    """
+
+    def __init__(self, max_size=512, ttl=7 * 24 * 60 * 60, path=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._in_flight: dict[tuple, Future] = {}
+
+        self._db_lock = Lock()
+        self._db = None
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "deduplicated": self.deduplicated, "size": len(self._entries)}
+
+    def get_or_translate(self, text: str, source: str, target: str, translate_method) -> str:
+        """ Returns cached translation or calls `translate_method(text, source, target)` """
+        text = normalize_text(text)
+        key = (text, source, target)
+
+        with self._lock:
+            translation = self._get_memory(key)
+            if translation is not None:
+                self.hits += 1
+                return translation
+
+            future = self._in_flight.get(key)
+            owner = future is None
+
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.deduplicated += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            translation = self._load(key)
+
+            if translation is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                translation = translate_method(text, source, target)
+                self._store(key, translation)
+
+            with self._lock:
+                self._put_memory(key, translation)
+
+            future.set_result(translation)
+            return translation
+        except BaseException as exception:
+            future.set_exception(exception)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get_or_translate_many(self, texts: list, source: str, target: str, translate_many) -> list:
+        """
+        Batch version of `get_or_translate()` for texts missing in the cache: calls
+        `translate_many(texts, source, target)`, which returns a translation per text, and stores them.
+        Concurrent requests of the same batch are de-duplicated, every text sent counts as a miss.
+        """
+        texts = [normalize_text(text) for text in texts]
+        key = (tuple(texts), source, target)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.misses += len(texts)
+            else:
+                self.deduplicated += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            translations = translate_many(texts, source, target)
+
+            for text, translation in zip(texts, translations):
+                self._store((text, source, target), translation)
+
+            with self._lock:
+                for text, translation in zip(texts, translations):
+                    self._put_memory((text, source, target), translation)
+
+            future.set_result(translations)
+            return translations
+        except BaseException as exception:
+            future.set_exception(exception)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def get(self, text: str, source: str, target: str):
+        """ Returns cached translation from either tier, None if there is none """
+        key = (normalize_text(text), source, target)
+
+        with self._lock:
+            translation = self._get_memory(key)
+            if translation is not None:
+                self.hits += 1
+                return translation
+
+        translation = self._load(key)
+
+        if translation is not None:
+            self.disk_hits += 1
+            with self._lock:
+                self._put_memory(key, translation)
+
+        return translation
+
+    def put(self, text: str, source: str, target: str, translation: str):
+        key = (normalize_text(text), source, target)
+
+        with self._lock:
+            self._put_memory(key, translation)
+
+        self._store(key, translation)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_memory(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        translation, created = entry
+        if time.time() - created > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return translation
+
+    def _put_memory(self, key: tuple, translation: str):
+        self._entries[key] = (translation, time.time())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS translations ("
+                             "text TEXT, source TEXT, target TEXT, translation TEXT, created REAL, "
+                             "PRIMARY KEY (text, source, target))")
+        return self._db
+
+    def _load(self, key: tuple):
+        if self.path is None:
+            return None
+
+        with self._db_lock:
+            db = self._connection()
+            row = db.execute("SELECT translation, created FROM translations "
+                             "WHERE text = ? AND source = ? AND target = ?", key).fetchone()
+
+            if row is None:
+                return None
+
+            if time.time() - row[1] > self.ttl:
+                db.execute("DELETE FROM translations WHERE text = ? AND source = ? AND target = ?", key)
+                db.commit()
+                return None
+
+            return row[0]
+
+    def _store(self, key: tuple, translation: str):
+        if self.path is None:
+            return
+
+        with self._db_lock:
+            db = self._connection()
+            db.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                       (*key, translation, time.time()))
+            db.commit()
+
+
+translation_cache = TranslationCache()
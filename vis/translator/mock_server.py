@@ -0,0 +1,69 @@
+"""
+Local stand-in for a translation provider. Translations are fake but deterministic and every request
+is delayed by `latency` seconds, so the translation path can be tested and benchmarked offline.
+
+Run standalone: python -m vis.translator.mock_server [port] [latency]
+"""
+import sys
+import json
+import time
+
+from threading import Thread
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+__all__ = ('mock_translate', 'start_mock_server')
+
+
+def mock_translate(text: str, source: str, target: str) -> str:
+    return f"[{source}>{target}] {text}"
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+
+        if url.path != '/translate':
+            self.send_error(404)
+            return
+
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        time.sleep(self.server.latency)
+
+        body = json.dumps({"translation": mock_translate(params.get('q', ''), params.get('sl', 'auto'),
+                                                         params.get('tl', 'en'))}).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_server(port=0, latency=0.05) -> ThreadingHTTPServer:
+    """ Starts the server in a daemon thread, port 0 picks a free one. Stop it with `shutdown()` """
+    server = ThreadingHTTPServer(('127.0.0.1', port), _MockHandler)
+    server.daemon_threads = True
+    server.latency = latency
+
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+    server = start_mock_server(port, latency)
+    print(f"Mock translator is listening on http://127.0.0.1:{server.server_port}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
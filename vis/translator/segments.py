@@ -0,0 +1,99 @@
+import re
+
+from .cache import TranslationCache, normalize_text
+
+__all__ = ('split_segments', 'split_paragraphs', 'translate_segments')
+
+# Lines longer than this are split further into sentences
+MAX_LINE_LENGTH = 120
+
+# Streamed translation sends paragraphs longer than this in parts
+MAX_PARAGRAPH_LINES = 10
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+
+# Segments of a batch are separated by an empty line: translators keep paragraphs, while they
+# often merge or wrap single lines
+_BATCH_SEPARATOR = '\n\n'
+_BATCH_SPLIT = re.compile(r'\n\s*\n')
+
+
+def split_segments(text: str) -> list:
+    """
+    Splits normalized text to lines of segments. A segment is a whole line, or a sentence of a long one.
+    Empty lines are kept as empty lists, so the text is reassembled with the same layout.
+    """
+    lines = []
+
+    for line in normalize_text(text).split('\n'):
+        if not line:
+            lines.append([])
+        elif len(line) > MAX_LINE_LENGTH:
+            lines.append(_SENTENCE_END.split(line))
+        else:
+            lines.append([line])
+
+    return lines
+
+
+def split_paragraphs(text: str, max_lines=MAX_PARAGRAPH_LINES) -> list:
+    """
+    Splits normalized text to (separator, part) pairs, a part is a paragraph or up to `max_lines` lines
+    of a long one. Joined separators and parts give the text back.
+    """
+    parts = []
+
+    for paragraph in normalize_text(text).split('\n\n'):
+        lines = paragraph.strip('\n').split('\n')
+
+        for start in range(0, len(lines), max_lines):
+            separator = '' if len(parts) == 0 else '\n' if start > 0 else '\n\n'
+            parts.append((separator, '\n'.join(lines[start:start + max_lines])))
+
+    return parts
+
+
+def translate_segments(text: str, source: str, target: str, translate_method, cache: TranslationCache) -> str:
+    """
+    Translates only the segments missing in the cache and reassembles the text from cached ones.
+    The missing segments are sent in a single request, one segment per paragraph. If the translator
+    doesn't keep the paragraphs, the batch is split in halves until it does, so a merged paragraph
+    costs a few more requests instead of one per segment.
+    """
+    lines = split_segments(text)
+
+    # Unique segments in the text order, the batch keeps the context of the neighbour lines
+    segments = list(dict.fromkeys(segment for line in lines for segment in line))
+
+    translations = {}
+    for segment in segments:
+        translation = cache.get(segment, source, target)
+        if translation is not None:
+            translations[segment] = translation
+
+    missing = [segment for segment in segments if segment not in translations]
+    if len(missing) == 1:
+        translations[missing[0]] = cache.get_or_translate(missing[0], source, target, translate_method)
+    elif missing:
+        def translate_many(texts, source, target):
+            return _translate_batch(texts, source, target, translate_method)
+
+        translations.update(zip(missing, cache.get_or_translate_many(missing, source, target, translate_many)))
+
+    return '\n'.join(' '.join(translations[segment] for segment in line) for line in lines)
+
+
+def _translate_batch(segments: list, source: str, target: str, translate_method) -> list:
+    """ Translations of the segments, bisects the batch if the paragraphs don't match """
+    if len(segments) == 1:
+        return [translate_method(segments[0], source, target)]
+
+    translated = _BATCH_SPLIT.split(translate_method(_BATCH_SEPARATOR.join(segments), source, target).strip())
+
+    if len(translated) == len(segments):
+        # A wrapped segment is a single line again
+        return [' '.join(translation.split()) for translation in translated]
+
+    middle = len(segments) // 2
+    return (_translate_batch(segments[:middle], source, target, translate_method)
+            + _translate_batch(segments[middle:], source, target, translate_method))
@@ -1,3 +1,4 @@
+import os
 import sys
 
 from PyQt5.QtCore import *
@@ -7,14 +8,39 @@ from PyQt5.QtGui import *
 from typing import Optional
 from PIL import Image
 
-from .selection import SelectionWindow
-from .translation import TranslationWindow
+from .selection import SelectionWindow, ScreenGrabber
 
+# Created on the first use, so importing vis doesn't start Qt
+_app: Optional[QApplication] = None
 
-_app: QApplication = QApplication(sys.argv)
 
-font_db = QFontDatabase()
-font_db.addApplicationFont("resources/font.ttf")
+def get_app() -> QApplication:
+    global _app
+
+    if _app is None:
+        _app = QApplication.instance() or QApplication(sys.argv)
+
+        font_db = QFontDatabase()
+        font_db.addApplicationFont("resources/font.ttf")
+
+    return _app
+
+
+def warm_up(cache_dir=None):
+    """
+    Loads the OCR and translation pipeline ahead of the first capture. Doesn't touch Qt objects,
+    so it can run on a background thread once the tray is up. With `cache_dir`, retrieved text and
+    translations are kept there between launches.
+    """
+    from vis import ocr, translator
+    from . import translation
+
+    if cache_dir is not None:
+        ocr.ocr_cache.path = os.path.join(cache_dir, "ocr_cache")
+        translator.translation_cache.path = os.path.join(cache_dir, "translations.sqlite")
+
+    ocr.warm_up()
+    translator.warm_up()
 
 
 # Thanks to https://github.com/pytest-dev/pytest-qt/issues/25
@@ -38,27 +64,53 @@ sys.excepthook = exceptionHandler.handler
 class WindowController(QObject):
     _enter_selection_window_signal = pyqtSignal()
 
-    def __init__(self):
+    def __init__(self, warm=False):
+        """
+        In warm mode a single hidden selection window and screen grabber are reused for every capture
+        instead of being created on each hotkey press.
+        """
         super().__init__()
+        get_app()
+
+        self.warm = warm
+        self.grabber: Optional[ScreenGrabber] = None
 
         self.selection_window: Optional[SelectionWindow] = None
-        self.translation_window: Optional[TranslationWindow] = None
+        self.translation_window: Optional['TranslationWindow'] = None
+
+    def prewarm(self):
+        """ Creates the reusable selection window ahead of the first capture """
+        if self.warm and self.selection_window is None:
+            self.grabber = ScreenGrabber()
+            self.selection_window = SelectionWindow(self.grabber, reusable=True)
+            self.selection_window.enter_translation.connect(self.open_translation_window)
 
     def enter_selection_window(self):
+        # Repeated hotkey presses while a capture is in progress are coalesced
+        if self.selection_window is not None and self.selection_window.isVisible():
+            return
+
         if self.translation_window is not None:
             self.translation_window.close()
 
-        self.selection_window = SelectionWindow()
-        self.selection_window.enter_translation.connect(self.open_translation_window)
+        if self.warm:
+            self.prewarm()
+            self.selection_window.capture()
+        else:
+            self.selection_window = SelectionWindow()
+            self.selection_window.enter_translation.connect(self.open_translation_window)
+
         self.selection_window.show()
 
     def open_translation_window(self, origin: QPoint, image: Image.Image):
+        from .translation import TranslationWindow
+
         shared_config = {}
 
         if self.translation_window is not None:
             shared_config = self.translation_window.shared_config
 
-        self.translation_window = TranslationWindow(origin, image)
+        self.translation_window = TranslationWindow(origin, image, self.grabber)
         self.translation_window.shared_config = shared_config
 
         self.selection_window.close()
@@ -77,8 +129,8 @@ class WindowControllerThreadSafe(WindowController):
     _open_translation_window_signal = pyqtSignal(QPoint, Image.Image)
     _close_all = pyqtSignal()
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, warm=False):
+        super().__init__(warm)
 
         self._enter_selection_window_signal.connect(super().enter_selection_window)
         self._open_translation_window_signal.connect(super().open_translation_window)
@@ -95,12 +147,12 @@ class WindowControllerThreadSafe(WindowController):
 
 
 def behave_as_daemon():
-    _app.setQuitOnLastWindowClosed(False)
+    get_app().setQuitOnLastWindowClosed(False)
 
 
 def run():
-    _app.exec()
+    get_app().exec()
 
 
 def quit():
-    _app.quit()
+    get_app().quit()
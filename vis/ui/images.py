@@ -0,0 +1,28 @@
+from PyQt5.QtGui import QImage, QPixmap
+from PIL import Image
+
+__all__ = ('pil_to_qimage', 'pil_to_qpixmap', 'bgra_to_qimage')
+
+
+def pil_to_qimage(image: Image.Image) -> QImage:
+    """ Converts the image in memory, the returned QImage owns a copy of the pixels """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    data = image.tobytes('raw', 'RGB')
+    qimage = QImage(data, image.width, image.height, image.width * 3, QImage.Format_RGB888)
+
+    # QImage doesn't own the wrapped buffer, detach it before `data` is released
+    return qimage.copy()
+
+
+def pil_to_qpixmap(image: Image.Image) -> QPixmap:
+    return QPixmap.fromImage(pil_to_qimage(image))
+
+
+def bgra_to_qimage(bgra, width: int, height: int) -> QImage:
+    """
+    Wraps a BGRA buffer (e.g. mss screenshot) without copying, which on little-endian machines is the
+    layout of Format_RGB32. The buffer must outlive the returned image.
+    """
+    return QImage(bgra, width, height, width * 4, QImage.Format_RGB32)
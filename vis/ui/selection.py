@@ -6,79 +6,190 @@ from typing import Optional
 from PIL import Image
 from mss import mss
 
-CACHE_IMAGE_NAME = "temp/screen.png"
+from vis.utils.timing import span, start_capture
+from vis.utils.frames import ScreenFrame
+
+from .images import bgra_to_qimage
+
+# Drawn over the screenshot instead of darkening a copy of it
+OVERLAY_COLOR = QColor(0, 0, 0, 128)
+
+
+class ScreenGrabber(QObject):
+    """
+    Long-lived screenshot source. Keeps one mss instance and the geometry of every screen,
+    the geometry is recomputed only when the screens change.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._sct = None
+        self._screen_geometries: dict[int, QRect] = {}
+
+        app = QApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._on_screens_changed)
+
+        for screen in app.screens():
+            screen.geometryChanged.connect(self._on_screens_changed)
+
+    def screen_number_at(self, pos: QPoint) -> int:
+        return QApplication.desktop().screenNumber(pos)
+
+    def screen_geometry(self, screen_number: int) -> QRect:
+        if screen_number not in self._screen_geometries:
+            self._screen_geometries[screen_number] = QApplication.desktop().screen(screen_number).geometry()
+
+        return self._screen_geometries[screen_number]
+
+    def grab(self, screen_number: int):
+        if self._sct is None:
+            self._sct = mss()
+
+        # The first mss monitor is the union of all of them
+        return self._sct.grab(self._sct.monitors[screen_number + 1])
+
+    def grab_rect(self, rect: QRect):
+        """ Grabs only the given rectangle of the virtual desktop """
+        if self._sct is None:
+            self._sct = mss()
+
+        return self._sct.grab({"left": rect.x(), "top": rect.y(), "width": rect.width(), "height": rect.height()})
+
+    def _on_screen_added(self, screen: QScreen):
+        screen.geometryChanged.connect(self._on_screens_changed)
+        self._on_screens_changed()
+
+    def _on_screens_changed(self, *_):
+        self._screen_geometries.clear()
+
+        # mss caches the monitors too
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
 
 
 class SelectionWindow(QWidget):
     enter_translation = pyqtSignal(QPoint, Image.Image)
 
-    def __init__(self):
+    def __init__(self, grabber: ScreenGrabber = None, reusable=False):
+        """
+        Reusable window is only hidden on close and takes a new screenshot with `capture()`,
+        otherwise the screenshot is taken right away.
+        """
         super().__init__(None)
 
         self.setWindowFlags(Qt.WindowStaysOnTopHint)
         self.setFocusPolicy(Qt.StrongFocus)
 
-        self.screen_image: Optional[Image.Image] = None
+        self.grabber: ScreenGrabber = grabber or ScreenGrabber()
+        self.reusable = reusable
+
+        # The screenshot is kept only while the window is shown, the background wraps its buffer
+        self.frame: Optional[ScreenFrame] = None
+        self.background: Optional[QImage] = None
         self.selection_origin: Optional[QPoint] = None
-        self.selection: Optional[Selection] = None
+        self.selection: Selection = Selection(QRubberBand.Rectangle, self)
+        self.cursor_overridden = False
 
         self.setWindowFlag(Qt.FramelessWindowHint)
-        self._init_as_frozen_screen()
+
+        # paintEvent covers the whole exposed region, Qt doesn't have to clear it first
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+
+        self.selection.hide()
         self._init_shortcuts()
 
-        QApplication.setOverrideCursor(Qt.CrossCursor)
+        if not self.reusable:
+            self.capture()
 
-    def _init_as_frozen_screen(self):
-        target_screen_number = QApplication.desktop().screenNumber(QCursor.pos())
-        target_screen_geometry = QApplication.desktop().screen(target_screen_number).geometry()
+    def capture(self):
+        """ Takes a new screenshot of the screen under the cursor and resets the selection """
+        self.selection.hide()
+        self.selection_origin = None
 
-        self.setGeometry(target_screen_geometry)
+        # Timings of this screenshot and of everything retrieved from it are reported together
+        start_capture()
+        self._init_as_frozen_screen()
 
-        with mss() as sct:
-            # Take a screenshot of target screen and set it as background of the window
+        if not self.cursor_overridden:
+            QApplication.setOverrideCursor(Qt.CrossCursor)
+            self.cursor_overridden = True
 
-            screenshot = sct.grab(sct.monitors[target_screen_number + 1])
-            self.screen_image = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-            darken_image = self.screen_image.point(lambda p: p * 0.5)
-            darken_image.save(CACHE_IMAGE_NAME)
+    def _init_as_frozen_screen(self):
+        target_screen_number = self.grabber.screen_number_at(QCursor.pos())
+        self.setGeometry(self.grabber.screen_geometry(target_screen_number))
+
+        # Take a screenshot of target screen and set it as background of the window
+        with span('capture.grab'):
+            screenshot = self.grabber.grab(target_screen_number)
 
-        self.setStyleSheet(f'background-image: url("{CACHE_IMAGE_NAME}");')
+        with span('capture.convert'):
+            self.frame = ScreenFrame.from_screenshot(screenshot)
+            self.background = bgra_to_qimage(self.frame.pixels.data, *self.frame.size)
+
+    def _release_frame(self):
+        # The image doesn't own the buffer, it goes first
+        self.background = None
+        self.frame = None
 
     def _init_shortcuts(self):
         self.__qs = QShortcut(QKeySequence("Escape"), self)
         self.__qs.activated.connect(self.close)
 
     def paintEvent(self, event: QPaintEvent):
-        opt = QStyleOption()
-        opt.initFrom(self)
+        # Only the exposed part is repainted, e.g. around the moved selection
+        rect = event.rect()
+
         painter = QPainter(self)
 
-        self.style().drawPrimitive(QStyle.PE_Widget, opt, painter, self)
+        if self.background is not None:
+            painter.drawImage(rect, self.background, rect)
+        else:
+            painter.fillRect(rect, Qt.black)
+
+        painter.fillRect(rect, OVERLAY_COLOR)
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.buttons() == Qt.LeftButton:
-            self.selection = Selection(QRubberBand.Rectangle, self)
             self.selection_origin = event.pos()
 
             self.selection.setGeometry(QRect(self.selection_origin, QSize()))
             self.selection.show()
 
     def mouseMoveEvent(self, event: QMouseEvent):
-        if event.buttons() == Qt.LeftButton:
+        if event.buttons() == Qt.LeftButton and self.selection_origin is not None:
             self.selection.setGeometry(QRect(self.selection_origin, event.pos()).normalized())
 
     def mouseReleaseEvent(self, event: QMouseEvent):
+        if self.selection_origin is None or self.frame is None:
+            return
+
         rect: QRect = self.selection.geometry()
         box = (rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height())
 
         origin = self.geometry().topLeft() + rect.topLeft()
-        image = self.screen_image.crop(box)
+
+        with span('capture.crop'):
+            image = self.frame.crop(box)
 
         self.enter_translation.emit(origin, image)
 
     def close(self):
-        QApplication.restoreOverrideCursor()
-        super().close()
+        # The full screen frame isn't needed once the selection is emitted or cancelled
+        self._release_frame()
+
+        if self.cursor_overridden:
+            QApplication.restoreOverrideCursor()
+            self.cursor_overridden = False
+
+        if self.reusable:
+            self.selection_origin = None
+            self.hide()
+        else:
+            super().close()
 
 
 class Selection(QRubberBand):
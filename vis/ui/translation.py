@@ -7,26 +7,41 @@ from PIL import Image
 
 from vis.utils.colors import *
 from vis.utils.tasks import *
+from vis.utils.frames import FrameChangeDetector, ScreenFrame
+from vis.utils.timing import span, timings, start_capture, current_capture
 from vis.ocr import *
-from vis.translator import translate, SUPPORTED_TRANSLATOR_LANGUAGES
-from vis.languages import SHORT_LANGUAGE_CODES, LONG_LANGUAGE_CODES
+from vis import translator
+from vis.languages import to_short_code
 
-CACHE_IMAGE_NAME = 'temp/translation_image.png'
+from .images import pil_to_qpixmap
+
+# Rapid from-language changes (e.g. scrolling the combobox) are coalesced into a single retrieval
+FROM_LANG_DEBOUNCE_MS = 300
+
+# Watch mode grabs the region this often, the text is retrieved again only after the region settles
+# on a new content for a few grabs
+WATCH_INTERVAL_MS = 500
+WATCH_STABLE_FRAMES = 2
+
+# Shows how long the capture, OCR and translation of the current text took in the tools panel
+SHOW_TIMINGS = False
 
 
 class TranslationWindowBase(QWidget):
     def __init__(self, origin: QPoint, image: Image.Image):
         super().__init__()
 
-        image.save(CACHE_IMAGE_NAME)
+        with span('window.init'):
+            self._init_window(origin, image)
 
+    def _init_window(self, origin: QPoint, image: Image.Image):
         self.origin: QPoint = origin
         self.image: Image.Image = image
 
-        self.dominant_colors: [tuple[int]] = get_dominant_colors(self.image)
-        self.primal_color = self.dominant_colors[2]
+        # Only the panel and text colors are needed, not the whole palette
+        with span('window.colors'):
+            self.primal_color, self.text_color = get_background_foreground(self.image)
         self.primal_color_str = ','.join(map(str, self.primal_color))
-        self.text_color = (200, 200, 200) if is_dark_color(self.primal_color) else (35, 35, 35)
         self.text_color_str = ','.join(map(str, self.text_color))
 
         self.book_view: bool = image.width / image.height <= 2
@@ -105,7 +120,7 @@ class TranslationWindowBase(QWidget):
     def _init_image_panel(self) -> QLabel:
         background_image = QLabel(self)
         background_image.setGeometry(self.image_panel_rect)
-        background_image.setPixmap(QPixmap("temp/translation_image.png"))
+        background_image.setPixmap(pil_to_qpixmap(self.image))
 
         return background_image
 
@@ -164,11 +179,36 @@ class TranslationWindowBase(QWidget):
 
 class TranslationWindow(TranslationWindowBase):
     _set_document_signal = pyqtSignal(TextDocument)
+    _set_retrieved_text_signal = pyqtSignal(str)
+    _set_translation_signal = pyqtSignal(str)
+    _task_failed_signal = pyqtSignal(str)
 
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self, origin: QPoint, image: Image.Image, grabber=None):
+        super().__init__(origin, image)
+
+        self.capture_id = current_capture()
 
         self._set_document_signal.connect(self._set_document)
+        self._set_retrieved_text_signal.connect(self._set_retrieved_text)
+        self._set_translation_signal.connect(self._set_translation)
+        self._task_failed_signal.connect(self._task_failed)
+
+        self.tasks = TaskGroup()
+        self.busy_channels = set()
+
+        self.from_lang_timer = QTimer(self)
+        self.from_lang_timer.setSingleShot(True)
+        self.from_lang_timer.setInterval(FROM_LANG_DEBOUNCE_MS)
+        self.from_lang_timer.timeout.connect(self.retrieve_text_with_from_lang)
+
+        # Watched screen region, the window is moved away from it in watch mode
+        self.region = QRect(self.origin, QSize(*self.image.size))
+        self.grabber = grabber
+        self.frame_detector = FrameChangeDetector(WATCH_STABLE_FRAMES)
+
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(WATCH_INTERVAL_MS)
+        self.watch_timer.timeout.connect(self._watch_region)
 
         self._connect_panels()
 
@@ -187,6 +227,7 @@ class TranslationWindow(TranslationWindowBase):
         self.tools_panel.on_retrieving_mode_changed.connect(self._on_retrieving_mode_changed)
         self.tools_panel.on_from_lang_changed.connect(self._on_from_lang_changed)
         self.tools_panel.on_to_lang_changed.connect(self._on_to_lang_changed)
+        self.tools_panel.on_watch_mode_changed.connect(self.set_watch_mode)
 
     def _on_retrieving_mode_changed(self, state):
         if state:
@@ -195,37 +236,159 @@ class TranslationWindow(TranslationWindowBase):
             self.retrieved_text = self.text_panel.toPlainText()
             self.force_text_translation()
 
-    def _on_from_lang_changed(self, lang):
-        self.retrieved_text = retrieve_text_with_lang(self.image, LONG_LANGUAGE_CODES[lang])
-
-        if self.tools_panel.text_retrieving_mode:
-            self.text_panel.setText(self.retrieved_text)
-        else:
-            self.force_text_translation()
+    def _on_from_lang_changed(self, _):
+        # Restarting the timer drops the previous change
+        self.from_lang_timer.start()
 
     def _on_to_lang_changed(self, _):
         if not self.tools_panel.text_retrieving_mode:
             self.force_text_translation()
 
+    def set_watch_mode(self, state: bool, interval_ms=None):
+        """ Grabs the selected region periodically and retrieves the text again when it changes """
+        if interval_ms is not None:
+            self.watch_timer.setInterval(interval_ms)
+
+        if not state:
+            self.watch_timer.stop()
+            return
+
+        if self.grabber is None:
+            from .selection import ScreenGrabber
+            self.grabber = ScreenGrabber()
+
+        self._move_off_region()
+        self.frame_detector.reset()
+        self.watch_timer.start()
+
+    def _move_off_region(self):
+        """ Places the window below the region or above it near the screen bottom, otherwise it grabs itself """
+        if not self.geometry().intersects(self.region):
+            return
+
+        screen = QApplication.screenAt(self.region.center()) or QApplication.primaryScreen()
+        available = screen.availableGeometry()
+
+        y = self.region.bottom() + 1
+        if y + self.height() > available.bottom():
+            y = max(available.top(), self.region.top() - self.height())
+
+        self.move(self.region.left(), y)
+
+    def _watch_region(self):
+        # Grabs are skipped while the last change is retrieved or the window is dragged over the region
+        if 'retrieve' in self.busy_channels or self.geometry().intersects(self.region):
+            return
+
+        screenshot = self.grabber.grab_rect(self.region)
+        # The raw buffer, `bgra` would copy it
+        if not self.frame_detector.update(screenshot.raw, *screenshot.size):
+            return
+
+        self.capture_id = start_capture()
+
+        self.image = ScreenFrame.from_screenshot(screenshot).to_image()
+        self.image_panel.setPixmap(pil_to_qpixmap(self.image))
+
+        if to_ocr_language(self.tools_panel.from_lang) is None:
+            self.retrieve_text_with_lang_detect()
+        else:
+            self.retrieve_text_with_from_lang()
+
+    def _set_busy(self, channel: str, state: bool):
+        if state:
+            self.busy_channels.add(channel)
+        else:
+            self.busy_channels.discard(channel)
+
+        self.tools_panel.set_working(len(self.busy_channels) > 0)
+
+        if SHOW_TIMINGS and not state:
+            self.tools_panel.set_timings(timings.capture(self.capture_id))
+
     def force_text_translation(self):
-        run_non_blocking(
-            translate, (self.retrieved_text, self.tools_panel.from_lang, self.tools_panel.to_lang),
-            self.text_panel.set_text_thread_safe)
+        # Paragraphs are shown as soon as they are translated
+        self._set_busy('translate', True)
+        self.text_panel.clear()
+        self.tasks.submit_stream(
+            'translate', translator.translate_stream,
+            (self.retrieved_text, self.tools_panel.from_lang, self.tools_panel.to_lang),
+            self.text_panel.append_text_thread_safe, self._set_translation_signal.emit,
+            lambda exception: self._task_failed_signal.emit('translate'))
 
     def retrieve_text_with_lang_detect(self):
-        retrieve = (retrieve_text_document_fast if self.small else retrieve_text_document)
-        run_non_blocking(retrieve, (self.image, ), self._set_document_signal.emit)
+        self._set_busy('retrieve', True)
+
+        if self.small:
+            self.tasks.submit('retrieve', retrieve_text_document_fast, (self.image, ),
+                              self._set_document_signal.emit, self._retrieve_failed)
+            return
+
+        if not self.tools_panel.text_retrieving_mode:
+            # Nothing to show before the translation, a single pass is cheaper than bands
+            self.tasks.submit('retrieve', retrieve_text_document, (self.image, ),
+                              self._set_document_signal.emit, self._retrieve_failed)
+            return
+
+        # The first pass text is shown band by band, the final document replaces it
+        self.text_panel.clear()
+        self.tasks.submit_stream('retrieve', stream_text_document, (self.image, ),
+                                 self.text_panel.append_text_thread_safe, self._set_document_signal.emit,
+                                 self._retrieve_failed)
+
+    def retrieve_text_with_from_lang(self):
+        self._set_busy('retrieve', True)
+        self.tasks.submit('retrieve', retrieve_text_with_lang,
+                          (self.image, to_ocr_language(self.tools_panel.from_lang)),
+                          self._set_retrieved_text_signal.emit, self._retrieve_failed)
+
+    def _retrieve_failed(self, exception):
+        self._task_failed_signal.emit('retrieve')
 
     def _set_document(self, document):
+        self._set_busy('retrieve', False)
+
         self.retrieved_text = document.text
-        self.text_panel.setText(document.text)
+
+        # The text is already retrieved with this language, don't retrieve it again
+        self.tools_panel.blockSignals(True)
         self.tools_panel.from_lang = document.lang
+        self.tools_panel.blockSignals(False)
+
+        if self.tools_panel.text_retrieving_mode:
+            self.text_panel.setText(document.text)
+        else:
+            self.force_text_translation()
+
+    def _set_retrieved_text(self, text):
+        self._set_busy('retrieve', False)
+        self.retrieved_text = text
+
+        if self.tools_panel.text_retrieving_mode:
+            self.text_panel.setText(self.retrieved_text)
+        else:
+            self.force_text_translation()
+
+    def _set_translation(self, text):
+        self._set_busy('translate', False)
+        self.text_panel.setText(text)
+
+    def _task_failed(self, channel: str):
+        # The exception is already reported by the executor, the window only stops waiting for the result
+        self._set_busy(channel, False)
+
+    def closeEvent(self, event: QCloseEvent):
+        self.from_lang_timer.stop()
+        self.watch_timer.stop()
+        self.tasks.close()
+        super().closeEvent(event)
 
 
 class ToolsPanel(QWidget):
     on_retrieving_mode_changed = pyqtSignal(bool)
     on_from_lang_changed = pyqtSignal(str)
     on_to_lang_changed = pyqtSignal(str)
+    on_watch_mode_changed = pyqtSignal(bool)
 
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args)
@@ -235,6 +398,9 @@ class ToolsPanel(QWidget):
         self.from_lang_box: QComboBox = self._init_from_lang_box()
         self.to_lang_box: QComboBox = self._init_to_lang_box()
         self.retrieve_mode_button: QPushButton = self._init_retrieve_mode_button()
+        self.watch_button: QPushButton = self._init_watch_button()
+        self.working_label: QLabel = self._init_working_label()
+        self.timings_label: QLabel = self._init_timings_label()
 
         self.text_retrieving_mode = True
         self.set_text_retrieving_mode(True)
@@ -266,7 +432,8 @@ class ToolsPanel(QWidget):
             "QComboBox::down-arrow {image: url(noimg); border-width: 0px;}" + \
             "QComboBox, QAbstractItemView{"+f"color: rgb({self.text_color_str})"+"};")
 
-        from_lang_box.addItems([SHORT_LANGUAGE_CODES[lang] for lang in SUPPORTED_OCR_LANGUAGES])
+        # Languages without 639-1 code (e.g. osd) can't be translated
+        from_lang_box.addItems(sorted({to_short_code(lang) for lang in SUPPORTED_OCR_LANGUAGES} - {None}))
         from_lang_box.view().setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         from_lang_box.currentTextChanged.connect(self.on_from_lang_changed.emit)
         from_lang_box.move(4, 0)
@@ -280,7 +447,7 @@ class ToolsPanel(QWidget):
             "QComboBox::down-arrow {image: url(noimg); border-width: 0px;}" + \
             "QComboBox, QAbstractItemView{ "+f"color: rgb({self.text_color_str})"+"};")
 
-        to_lang_box.addItems(SUPPORTED_TRANSLATOR_LANGUAGES)
+        to_lang_box.addItems(translator.SUPPORTED_TRANSLATOR_LANGUAGES)
         to_lang_box.view().setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         to_lang_box.currentTextChanged.connect(self.on_to_lang_changed.emit)
         to_lang_box.move(39, 0)
@@ -295,6 +462,62 @@ class ToolsPanel(QWidget):
         retrieve_mode_button.clicked.connect(self.switch_text_retrieving_mode)
         return retrieve_mode_button
 
+    def _init_watch_button(self) -> QPushButton:
+        watch_button = QPushButton("w", self)
+        watch_button.setFixedSize(16, 16)
+        watch_button.setCheckable(True)
+        watch_button.setToolTip("Watch the region and translate its changes")
+        watch_button.setStyleSheet(f"color: rgb({self.text_color_str})")
+
+        watch_button.toggled.connect(self._on_watch_button_toggled)
+        return watch_button
+
+    def _on_watch_button_toggled(self, state: bool):
+        self.watch_button.setText("W" if state else "w")
+        self.on_watch_mode_changed.emit(state)
+
+    def _init_working_label(self) -> QLabel:
+        working_label = QLabel("...", self)
+        working_label.setStyleSheet(f"color: rgb({self.text_color_str}); border: 0;")
+        working_label.hide()
+
+        return working_label
+
+    def _init_timings_label(self) -> QLabel:
+        timings_label = QLabel(self)
+        timings_label.setStyleSheet(f"color: rgb({self.text_color_str}); border: 0; font-size: 10px;")
+        timings_label.hide()
+
+        return timings_label
+
+    def resizeEvent(self, event: QResizeEvent):
+        self._place_labels()
+        super().resizeEvent(event)
+
+    def _place_labels(self):
+        right = self.width() - self.watch_button.width() - 4
+        self.watch_button.move(right, 2)
+
+        right -= self.working_label.sizeHint().width() + 4
+        self.working_label.move(right, 2)
+
+        self.timings_label.adjustSize()
+        self.timings_label.move(right - self.timings_label.width() - 4, 4)
+
+    def set_working(self, state: bool):
+        self.working_label.setVisible(state)
+
+    def set_timings(self, stages: dict):
+        """ Shows total milliseconds of the capture, OCR and translation stages """
+        groups = (("cap", "capture."), ("ocr", "ocr."), ("tr", "translate"))
+        totals = [(name, sum(ms for stage, ms in stages.items()
+                             if stage.startswith(prefix) and stage != 'translate.request'))
+                  for name, prefix in groups]
+
+        self.timings_label.setText(' '.join(f"{name} {ms:.0f}" for name, ms in totals if ms > 0))
+        self.timings_label.setVisible(bool(self.timings_label.text()))
+        self._place_labels()
+
     def switch_text_retrieving_mode(self):
         self.set_text_retrieving_mode(not self.text_retrieving_mode)
 
@@ -312,11 +535,22 @@ class ToolsPanel(QWidget):
 
 class TextPanel(QTextEdit):
     _set_text_signal = pyqtSignal(str)
+    _append_text_signal = pyqtSignal(str)
 
     def __init__(self, *args):
         super().__init__(*args)
 
         self._set_text_signal.connect(self.setText)
+        self._append_text_signal.connect(self.append_text)
 
     def set_text_thread_safe(self, text):
         self._set_text_signal.emit(text)
+
+    def append_text(self, text):
+        """ Adds the text to the end as is, unlike `append()` it doesn't start a new paragraph """
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+
+    def append_text_thread_safe(self, text):
+        self._append_text_signal.emit(text)
@@ -1,27 +1,48 @@
+import numpy as np
+
 from PIL import Image
 
-__all__ = ('get_dominant_colors', 'is_dark_color')
+__all__ = ('get_dominant_colors', 'get_background_foreground', 'is_dark_color')
 
+# Colors are grouped to 8 levels per channel, close shades fall to the same bucket
+BUCKET_BITS = 3
 
-# Thanks to https://gist.github.com/zollinger/1722663
-def get_dominant_colors(image: Image.Image, numcolors=10, resize=150):
-    image = image.copy()
 
-    # Resize image to speed up processing
-    image.thumbnail((resize, resize))
+def _sample_pixels(image: Image.Image, resize: int) -> np.ndarray:
+    """ Returns Nx3 array of RGB pixels, large images are downsampled with a stride to fit `resize` """
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    step = max(1, -(-max(image.size) // resize))
+    if step > 1:
+        image = image.resize((max(1, image.width // step), max(1, image.height // step)), Image.NEAREST)
+
+    return np.asarray(image).reshape(-1, 3)
 
-    # Reduce to palette
-    paletted = image.convert('P', palette=Image.ADAPTIVE, colors=numcolors)
 
-    # Find dominant colors
-    palette = paletted.getpalette()
-    color_counts = sorted(paletted.getcolors(), reverse=True)
+def _bucket_means(pixels: np.ndarray) -> np.ndarray:
+    """ Mean colors of the non-empty buckets, from the most to the least common bucket """
+    shift = 8 - BUCKET_BITS
+    quantized = (pixels >> shift).astype(np.int32)
+    index = (quantized[:, 0] << (2 * BUCKET_BITS)) | (quantized[:, 1] << BUCKET_BITS) | quantized[:, 2]
 
-    colors = []
-    for i in range(min(len(color_counts), numcolors)):
-        palette_index = color_counts[i][1]
-        dominant_color = palette[palette_index*3:palette_index*3+3]
-        colors.append(tuple(dominant_color))
+    bins = 1 << (3 * BUCKET_BITS)
+    counts = np.bincount(index, minlength=bins)
+    sums = np.stack([np.bincount(index, weights=pixels[:, channel], minlength=bins) for channel in range(3)],
+                    axis=1)
+
+    # Stable sort, so equal counts keep a deterministic order
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+
+    return np.rint(sums[order] / counts[order, None]).astype(np.uint8)
+
+
+def get_dominant_colors(image: Image.Image, numcolors=10, resize=150):
+    """ Returns `numcolors` colors from the most to the least common one """
+    means = _bucket_means(_sample_pixels(image, resize))
+
+    colors = [tuple(int(channel) for channel in color) for color in means[:numcolors]]
 
     while len(colors) < numcolors:
         colors.append(colors[0])
@@ -29,6 +50,25 @@ def get_dominant_colors(image: Image.Image, numcolors=10, resize=150):
     return colors
 
 
+def get_background_foreground(image: Image.Image, resize=150, min_contrast=60):
+    """
+    Fast mode of `get_dominant_colors()`. Background is the most common color, foreground is the most
+    common one that differs enough from it in brightness.
+    """
+    means = _bucket_means(_sample_pixels(image, resize))
+
+    background = tuple(int(channel) for channel in means[0])
+    luminance = means @ np.array([0.2126, 0.7152, 0.0722])
+
+    contrast = np.abs(luminance - luminance[0]) >= min_contrast
+    if contrast.any():
+        foreground = tuple(int(channel) for channel in means[np.argmax(contrast)])
+    else:
+        foreground = (35, 35, 35) if not is_dark_color(background) else (200, 200, 200)
+
+    return background, foreground
+
+
 # https://stackoverflow.com/questions/12043187/how-to-check-if-hex-color-is-too-black
 def is_dark_color(color):
     r, g, b = color
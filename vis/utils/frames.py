@@ -0,0 +1,106 @@
+import zlib
+import numpy as np
+
+from PIL import Image
+
+__all__ = ('FrameChangeDetector', 'ScreenFrame')
+
+# Frames are compared as grids of mean brightness of cells of this size, so noise and
+# subpixel rendering don't count as a change
+CELL_SIZE = 8
+
+# A cell has changed if its mean brightness differs more than this
+CELL_THRESHOLD = 12
+
+
+class ScreenFrame:
+    """
+    Screenshot pixels in their single BGRA buffer (e.g. the raw buffer of an mss screenshot, which
+    `bgra` would copy). Crops are views of it, only the selected part is copied to an image.
+    """
+
+    def __init__(self, buffer, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels: np.ndarray = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+
+    @classmethod
+    def from_screenshot(cls, screenshot) -> 'ScreenFrame':
+        return cls(screenshot.raw, *screenshot.size)
+
+    @property
+    def size(self) -> tuple:
+        return self.width, self.height
+
+    def view(self, box: tuple) -> np.ndarray:
+        """ BGRA pixels of the (left, top, right, bottom) box without copying """
+        left, top, right, bottom = box
+        return self.pixels[max(0, top):min(bottom, self.height), max(0, left):min(right, self.width)]
+
+    def crop(self, box: tuple) -> Image.Image:
+        """ RGB image of the box, only the box is copied """
+        view = self.view(box)
+        return Image.frombytes("RGB", (view.shape[1], view.shape[0]), view.tobytes(), "raw", "BGRX")
+
+    def to_image(self) -> Image.Image:
+        return self.crop((0, 0, self.width, self.height))
+
+
+class FrameChangeDetector:
+    """
+    Tells when the content of a watched region settles on something new. A frame is reported only
+    after it stayed the same for `stable_frames` updates, so fades, scrolling and typing animations
+    are skipped, and only if it differs from the last reported one.
+    """
+
+    def __init__(self, stable_frames=2):
+        self.stable_frames = stable_frames
+
+        self._checksum = None
+        self._grid: np.ndarray = None
+        self._reported_grid: np.ndarray = None
+        self._stable_count = 0
+
+    def reset(self):
+        self._checksum = None
+        self._grid = None
+        self._reported_grid = None
+        self._stable_count = 0
+
+    @staticmethod
+    def _brightness_grid(bgra: bytes, width: int, height: int) -> np.ndarray:
+        pixels = np.frombuffer(bgra, dtype=np.uint8).reshape(height, width, 4)
+
+        rows, columns = max(1, height // CELL_SIZE), max(1, width // CELL_SIZE)
+        cell_height, cell_width = max(1, height // rows), max(1, width // columns)
+        pixels = pixels[:rows * cell_height, :columns * cell_width, :3]
+
+        # Sum of the channels instead of the weighted gray, it's only compared to itself
+        cells = pixels.reshape(rows, cell_height, columns, cell_width, 3)
+        return cells.mean(axis=(1, 3, 4), dtype=np.float32)
+
+    @staticmethod
+    def _differs(grid: np.ndarray, other: np.ndarray) -> bool:
+        return other is None or grid.shape != other.shape or bool((np.abs(grid - other) > CELL_THRESHOLD).any())
+
+    def update(self, bgra: bytes, width: int, height: int) -> bool:
+        """ Takes the next raw BGRA frame, returns True if it's a new settled content """
+        checksum = zlib.crc32(bgra)
+
+        # Identical bytes are the common case of a static region, the grid isn't needed then
+        if checksum != self._checksum:
+            grid = self._brightness_grid(bgra, width, height)
+
+            if self._differs(grid, self._grid):
+                self._stable_count = 0
+
+            self._checksum = checksum
+            self._grid = grid
+
+        self._stable_count += 1
+
+        if self._stable_count < self.stable_frames or not self._differs(self._grid, self._reported_grid):
+            return False
+
+        self._reported_grid = self._grid
+        return True
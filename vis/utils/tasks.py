@@ -1,10 +1,215 @@
-from threading import Thread
+import sys
+import time
+import contextvars
 
-__all__ = ('run_non_blocking',)
+from threading import Lock
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 
+__all__ = ('TaskExecutor', 'TaskGroup', 'get_executor', 'run_non_blocking')
 
-def run_non_blocking(method, args, callback):
-    def wrapper():
-        callback(method(*args))
 
-    Thread(target=wrapper).start()
+class TaskExecutor:
+    """ Bounded pool of worker threads shared by all windows, collects queue and latency metrics """
+
+    def __init__(self, max_workers=4, latency_window=256):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='vis-task')
+        self._lock = Lock()
+
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+
+        self._wait_times = deque(maxlen=latency_window)
+        self._run_times = deque(maxlen=latency_window)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.submitted - self.started
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            wait_times = sorted(self._wait_times)
+            run_times = sorted(self._run_times)
+
+        return {"queue_depth": self.queue_depth, "submitted": self.submitted, "completed": self.completed,
+                "wait_p50_ms": _percentile(wait_times, 0.5) * 1000,
+                "wait_p95_ms": _percentile(wait_times, 0.95) * 1000,
+                "run_p50_ms": _percentile(run_times, 0.5) * 1000,
+                "run_p95_ms": _percentile(run_times, 0.95) * 1000}
+
+    def submit(self, method, args, callback=None, errback=None) -> Future:
+        """
+        Runs `method(*args)` on a worker and passes the result to `callback` on the same worker.
+        The task runs in a copy of the submitter's context, so it keeps e.g. the capture ID of the timings.
+
+        An exception of the task is reported by `sys.excepthook` and passed to `errback`, so a caller
+        waiting for the callback can clean up.
+        """
+        submit_time = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def wrapper():
+            start_time = time.perf_counter()
+            with self._lock:
+                self.started += 1
+                self._wait_times.append(start_time - submit_time)
+
+            try:
+                result = context.run(method, *args)
+            except BaseException as exception:
+                # Nobody reads the future, without this the exception would be lost silently
+                sys.excepthook(type(exception), exception, exception.__traceback__)
+
+                if errback is not None:
+                    errback(exception)
+                raise
+            finally:
+                with self._lock:
+                    self.completed += 1
+                    self._run_times.append(time.perf_counter() - start_time)
+
+            if callback is not None:
+                callback(result)
+
+            return result
+
+        with self._lock:
+            self.submitted += 1
+
+        future = self._executor.submit(wrapper)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        # Cancelled tasks are never started, don't count them as queued
+        if future.cancelled():
+            with self._lock:
+                self.started += 1
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class TaskGroup:
+    """
+    Tasks of a single window. Every channel keeps a generation counter, a new task in a channel
+    makes the older ones stale: queued ones are cancelled and results of the running ones are dropped,
+    so a slow old result can't overwrite a newer one. `close()` cancels all the work of the group.
+    """
+
+    def __init__(self, executor: TaskExecutor = None):
+        self.executor = executor or get_executor()
+
+        self._lock = Lock()
+        self._generations: dict[str, int] = {}
+        self._futures: dict[str, Future] = {}
+        self._closed = False
+
+    def submit(self, channel: str, method, args, callback=None, errback=None) -> Future:
+        """ `errback` gets the exception of the task instead of `callback`, unless the task is stale """
+        with self._lock:
+            if self._closed:
+                return None
+
+            return self._submit(channel, self._next_generation(channel), method, args, callback, errback)
+
+    def submit_stream(self, channel: str, method, args, on_item=None, callback=None, errback=None) -> Future:
+        """
+        Same as `submit()` for a generator `method`: every yielded item is passed to `on_item` and the
+        returned value to `callback`. The generator is stopped as soon as the task becomes stale.
+        """
+        with self._lock:
+            if self._closed:
+                return None
+
+            generation = self._next_generation(channel)
+
+            def run_stream(*stream_args):
+                stream = method(*stream_args)
+
+                try:
+                    while True:
+                        item = next(stream)
+
+                        if not self.is_current(channel, generation):
+                            return None
+
+                        if on_item is not None:
+                            on_item(item)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    stream.close()
+
+            return self._submit(channel, generation, run_stream, args, callback, errback)
+
+    def _next_generation(self, channel: str) -> int:
+        generation = self._generations.get(channel, 0) + 1
+        self._generations[channel] = generation
+
+        previous = self._futures.get(channel)
+        if previous is not None:
+            previous.cancel()
+
+        return generation
+
+    def _submit(self, channel: str, generation: int, method, args, callback, errback) -> Future:
+        def deliver(result):
+            if callback is not None and self.is_current(channel, generation):
+                callback(result)
+
+        def deliver_error(exception):
+            if errback is not None and self.is_current(channel, generation):
+                errback(exception)
+
+        future = self.executor.submit(method, args, deliver, deliver_error)
+        self._futures[channel] = future
+
+        return future
+
+    def is_current(self, channel: str, generation: int) -> bool:
+        with self._lock:
+            return not self._closed and self._generations.get(channel) == generation
+
+    def cancel(self, channel: str):
+        with self._lock:
+            self._generations[channel] = self._generations.get(channel, 0) + 1
+
+            future = self._futures.pop(channel, None)
+            if future is not None:
+                future.cancel()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+
+
+def _percentile(values: list, q: float) -> float:
+    if len(values) == 0:
+        return 0
+
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+_executor: TaskExecutor = None
+_executor_lock = Lock()
+
+
+def get_executor() -> TaskExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = TaskExecutor()
+
+    return _executor
+
+
+def run_non_blocking(method, args, callback):
+    get_executor().submit(method, args, callback)
@@ -0,0 +1,129 @@
+import time
+import json
+import uuid
+
+from threading import Lock
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import OrderedDict, deque
+
+from .tasks import _percentile
+
+__all__ = ('Timings', 'timings', 'span', 'timed', 'start_capture', 'current_capture')
+
+_capture_id: ContextVar = ContextVar('vis_capture_id', default=None)
+
+
+def start_capture() -> str:
+    """ Starts a new capture in the current context, spans recorded from now on belong to it """
+    capture_id = uuid.uuid4().hex[:8]
+    _capture_id.set(capture_id)
+    return capture_id
+
+
+def current_capture():
+    return _capture_id.get()
+
+
+class Timings:
+    """
+    Durations of the pipeline stages. Every stage keeps a rolling window of its last `window` durations
+    for the percentiles, and the stages of the last `max_captures` captures are kept by capture ID.
+    """
+
+    def __init__(self, window=256, max_captures=64):
+        self.window = window
+        self.max_captures = max_captures
+
+        self._lock = Lock()
+        self._durations: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        self._sums: dict[str, float] = {}
+        self._captures = OrderedDict()
+
+    def record(self, stage: str, seconds: float, capture_id=None):
+        with self._lock:
+            durations = self._durations.get(stage)
+            if durations is None:
+                durations = self._durations[stage] = deque(maxlen=self.window)
+
+            durations.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            self._sums[stage] = self._sums.get(stage, 0) + seconds
+
+            if capture_id is not None:
+                stages = self._captures.setdefault(capture_id, {})
+                stages[stage] = stages.get(stage, 0) + seconds
+                self._captures.move_to_end(capture_id)
+
+                while len(self._captures) > self.max_captures:
+                    self._captures.popitem(last=False)
+
+    def capture(self, capture_id: str) -> dict:
+        """ Total milliseconds of every stage of the capture """
+        with self._lock:
+            return {stage: seconds * 1000 for stage, seconds in self._captures.get(capture_id, {}).items()}
+
+    def percentiles(self) -> dict:
+        with self._lock:
+            snapshot = {stage: (sorted(durations), self._counts[stage], self._sums[stage])
+                        for stage, durations in self._durations.items()}
+
+        return {stage: {"count": count,
+                        "sum_ms": total * 1000,
+                        "p50_ms": _percentile(durations, 0.5) * 1000,
+                        "p95_ms": _percentile(durations, 0.95) * 1000,
+                        "max_ms": durations[-1] * 1000}
+                for stage, (durations, count, total) in sorted(snapshot.items())}
+
+    def to_json(self) -> str:
+        return json.dumps(self.percentiles(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """ Percentiles in the Prometheus text format, as a summary of seconds per stage """
+        lines = ["# HELP vis_stage_seconds Duration of the capture, OCR and translation stages",
+                 "# TYPE vis_stage_seconds summary"]
+
+        for stage, stats in self.percentiles().items():
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                lines.append(f'vis_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {stats[key] / 1000:.6f}')
+            lines.append(f'vis_stage_seconds_sum{{stage="{stage}"}} {stats["sum_ms"] / 1000:.6f}')
+            lines.append(f'vis_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+            self._sums.clear()
+            self._captures.clear()
+
+
+timings = Timings()
+
+
+@contextmanager
+def span(stage: str):
+    """ Records the duration of the block as the stage of the current capture """
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        timings.record(stage, time.perf_counter() - start, _capture_id.get())
+
+
+def timed(stage: str):
+    """ Decorator version of `span()` """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,8 +1,10 @@
+import os
 import keyboard
 import vis
 
 from PIL import Image
 from pystray import Icon, Menu, MenuItem
+from vis.utils.tasks import run_non_blocking
 
 
 def close():
@@ -12,13 +14,34 @@ def close():
     exit()
 
 
-controller = vis.WindowControllerThreadSafe()
-keyboard.add_hotkey("win+shift+a", lambda: controller.enter_selection_window())
+# Spawned worker processes import this module, they must not start another tray app
+if __name__ == '__main__':
+    from vis.ocr import tiles
+    from vis.ocr.verify_tesseract import verify_tesseract_installed
 
-icon = Icon('Vis', Image.open("resources/icon.png"), menu=Menu(
-    MenuItem("Select", controller.enter_selection_window, default=True),
-    MenuItem('Close', close)))
-icon.run_detached()
+    # Exits here, in the main thread, if tesseract is missing. Cached, it doesn't run tesseract
+    verify_tesseract_installed()
 
-vis.behave_as_daemon()
-vis.run()
+    # Full screen captures are retrieved band by band on a process pool
+    tiles.set_workers(os.cpu_count() or 1)
+
+    controller = vis.WindowControllerThreadSafe(warm=True)
+    controller.prewarm()
+    keyboard.add_hotkey("win+shift+a", lambda: controller.enter_selection_window())
+
+    icon = Icon('Vis', Image.open("resources/icon.png"), menu=Menu(
+        MenuItem("Select", controller.enter_selection_window, default=True),
+        MenuItem('Close', close)))
+    icon.run_detached()
+
+    # The tray is up, load tesseract and the translator before the first capture,
+    # retrieved text and translations are kept between launches
+    run_non_blocking(vis.warm_up, ("temp", ), None)
+
+    # Other local tools can reuse the warm pipeline and caches, e.g. VIS_SERVICE_PORT=8766
+    if os.environ.get("VIS_SERVICE_PORT"):
+        from vis.service import start_service
+        start_service(int(os.environ["VIS_SERVICE_PORT"]), token=os.environ.get("VIS_SERVICE_TOKEN"))
+
+    vis.behave_as_daemon()
+    vis.run()